@@ -3,11 +3,18 @@ import signal
 from PyQt6.QtWidgets import QApplication
 
 from src.app import ScreenshotApp
+from src.utils.config import ConfigManager
+from src.utils.ipc import is_instance_running
 
 
 def main():
     signal.signal(signal.SIGINT, signal.SIG_DFL)
 
+    cfg = ConfigManager()
+    if cfg.get_ipc_enabled() and is_instance_running(cfg.get_ipc_socket_path()):
+        print("Swip is already running")
+        sys.exit(1)
+
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
     screenshot_app = ScreenshotApp()
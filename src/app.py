@@ -1,34 +1,155 @@
 from PyQt6.QtWidgets import QApplication, QSystemTrayIcon, QMenu
-from PyQt6.QtCore import QObject
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from typing import Any, Callable, Dict, Optional
 from PyQt6.QtGui import QIcon, QPixmap, QPainter, QColor
 import sys
 import os
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import ExitStack
 
 from src.ui.overlay import OverlayWindow
 from src.ui.settingsdialog import SettingsDialog
+from src.ui.imageconv import pil_to_qimage, qimage_to_pil
 from src.services.keybind import KeybindManager
 from src.services.screenshot import ScreenshotCapture
 from src.services.filemanager import FileManager
 from src.services.clipboard import ClipboardManager
-from src.utils.config import ConfigManager
+from src.services.capturequeue import CaptureJob, CaptureQueue
+from src.services.redaction import Redactor
+from src.services.watcher import RegionWatcher, Watch
+from src.services.scheduler import CaptureScheduler, ScheduledJob
+from src.services.scrollcapture import ScrollCapture
+from src.services import memreport
+from src.services.ipcserver import IPCServer
+from src.services.stallwatch import StallWatchdog, format_reports
+from src.utils.config import PRESET_ACTION_PREFIX, ConfigManager
+from src import __version__
 
 
 logger = logging.getLogger(__name__)
 
 
+LARGE_CAPTURE_BYTES = 8 * 1024 * 1024
+CONFIG_SAVE_DELAY_MS = 2000
+
+
 class ScreenshotApp(QObject):
 
+    capture_finished = pyqtSignal(object)
+    scroll_capture_done = pyqtSignal()
+
     def __init__(self):
         super().__init__()
         
         self.config = ConfigManager()
         
+        sw = self.config.get_stall_watchdog_settings()
+        self.watchdog = StallWatchdog(
+            threshold_ms=sw["threshold_ms"],
+            interval_ms=sw["interval_ms"],
+            max_reports=sw["max_reports"],
+            parent=self,
+        )
+        self._watchdog_enabled = sw["enabled"]
+        
         self.overlay = OverlayWindow()
+        self.overlay.snapping_enabled = self.config.get_snapping_enabled()
+        self.overlay.magnifier_enabled = self.config.get_magnifier_enabled()
+        
+        self.low_memory = self.config.get_low_memory()
+        self.overlay.release_on_hide = self.low_memory
+        if self.config.get_memory_tracing():
+            memreport.start_tracing()
         self.keybind_manager = KeybindManager(self.config)
         self.screenshot_service = ScreenshotCapture()
-        self.file_manager = FileManager(self.config.get_screenshot_directory())
-        self.clipboard_manager = ClipboardManager()
+        self.file_manager = FileManager.from_config(self.config)
+        self.clipboard_manager = ClipboardManager(retain_last_image=not self.low_memory)
+        
+        self.redactor = Redactor.from_settings(self.config.get_redaction_settings())
+        
+        self.exporter = None
+        es = self.config.get_export_settings()
+        if es["targets"]:
+            from src.services.exporter import ExportQueue
+            self.exporter = ExportQueue(
+                self.config.get_export_queue_path(),
+                es["targets"],
+                concurrency=es["concurrency"],
+                max_attempts=es["max_attempts"],
+                backoff_base=es["backoff_base"],
+                backoff_max=es["backoff_max"],
+                timeout=es["timeout"],
+                dead_retention=es["dead_retention_days"] * 86400,
+            )
+        
+        qs = self.config.get_capture_queue_settings()
+        self.capture_queue = CaptureQueue(
+            self._process_capture,
+            max_jobs=qs["max_jobs"],
+            max_bytes=qs["max_bytes"],
+            policy=qs["policy"],
+            workers=qs["workers"],
+        )
+        
+        self.watcher = RegionWatcher(
+            self.screenshot_service.capture_region, self._handle_watch_change
+        )
+        for wc in self.config.get_watch_regions():
+            wc = dict(wc)
+            try:
+                self.watcher.add_watch(wc.pop("name"), wc.pop("region"), **wc)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Invalid watch region {wc}: {e}")
+        
+        self.recompressor = None
+        rc = self.config.get_recompression_settings()
+        if rc["enabled"]:
+            from src.services.recompress import ArchiveRecompressor
+            self.recompressor = ArchiveRecompressor(
+                str(self.file_manager.screenshot_directory),
+                self.config.get_recompression_checkpoint_path(),
+                is_busy=self._capture_busy,
+                workers=rc["workers"],
+                min_age=rc["min_age"],
+                compress_level=rc["compress_level"],
+                palette=rc["palette"],
+                rescan_interval=rc["rescan_interval"],
+                pause_on_battery=rc["pause_on_battery"],
+            )
+        
+        self._grab_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="swip-grab")
+        # Hotkey grabs get their own thread so they never queue behind
+        # scroll-capture frames or a burst of scheduled jobs.
+        self._direct_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="swip-grab-direct")
+        self.scheduler = CaptureScheduler(
+            self._handle_scheduled_job, self.capture_queue.is_busy, parent=self
+        )
+        for sc in self.config.get_schedules():
+            try:
+                self.scheduler.add_job(self._make_scheduled_job(sc))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Invalid schedule {sc}: {e}")
+        
+        self.ipc_server = None
+        if self.config.get_ipc_enabled():
+            self.ipc_server = IPCServer(
+                self.config.get_ipc_socket_path(), self._ipc_handlers()
+            )
+        
+        self._scroll_pending = False
+        self._scroll: Optional[ScrollCapture] = None
+        self._scroll_files: Optional[ExitStack] = None
+        self._scroll_path: Optional[str] = None
+        self._scroll_region = None
+        self._scroll_grab: Optional[Future] = None
+        self._config_save_timer = QTimer(self)
+        self._config_save_timer.setSingleShot(True)
+        self._config_save_timer.setInterval(CONFIG_SAVE_DELAY_MS)
+        self._config_save_timer.timeout.connect(self._save_config_deferred)
+        
+        self._scroll_timer = QTimer(self)
+        self._scroll_timer.timeout.connect(self._scroll_tick)
         
         self._overlay_active = False
         self.overlay_is_active = False
@@ -63,6 +184,25 @@ class ScreenshotApp(QObject):
         s_action = menu.addAction("Settings")
         s_action.triggered.connect(self.show_settings)
         
+        r_action = menu.addAction("Repeat Last Region")
+        r_action.triggered.connect(self._handle_repeat_last_region)
+        
+        presets = self.config.get_region_presets()
+        if presets:
+            pm = menu.addMenu("Region Presets")
+            for p in presets:
+                a = pm.addAction(p["name"])
+                a.triggered.connect(lambda _=False, name=p["name"]: self.capture_preset(name))
+        
+        m_action = menu.addAction("Memory Report")
+        m_action.triggered.connect(self.show_memory_report)
+        
+        st_action = menu.addAction("Stall Reports")
+        st_action.triggered.connect(self.show_stall_reports)
+        
+        ex_action = menu.addAction("Export Stall Reports")
+        ex_action.triggered.connect(self.export_stall_reports)
+        
         menu.addSeparator()
         
         q_action = menu.addAction("Quit")
@@ -75,17 +215,28 @@ class ScreenshotApp(QObject):
     def _connect_signals(self):
         self.overlay.region_selected.connect(self._handle_region_capture)
         self.overlay.region_selected.connect(self.on_region_selected)
+        self.capture_finished.connect(self._on_capture_finished)
+        self.scroll_capture_done.connect(self._stop_scroll_capture)
 
     def on_region_selected(self, x, y, w, h):
         pass
 
-    def _load_keybinds_from_config(self):
+    def _keybind_callbacks(self) -> Dict[str, Callable]:
         cbs = {
             "overlay_toggle": self._handle_overlay_toggle,
             "fullscreen_capture": self._handle_fullscreen_capture,
+            "scroll_capture": self._handle_scroll_capture,
+            "repeat_last_region": self._handle_repeat_last_region,
         }
-        
-        self.keybind_manager.load_keybinds_from_config(cbs)
+        for p in self.config.get_region_presets():
+            if p.get("keybind"):
+                cbs[PRESET_ACTION_PREFIX + p["name"]] = (
+                    lambda name=p["name"]: self.capture_preset(name)
+                )
+        return cbs
+
+    def _load_keybinds_from_config(self):
+        self.keybind_manager.load_keybinds_from_config(self._keybind_callbacks())
 
     def setup_keybinds(self):
         pass
@@ -106,6 +257,10 @@ class ScreenshotApp(QObject):
             "fullscreen_capture"
         )
 
+    def _capture_busy(self) -> bool:
+        # Background maintenance backs off while the user is capturing.
+        return self._overlay_active or self._scroll is not None or self.capture_queue.is_busy()
+
     def _handle_overlay_toggle(self):
         if self._overlay_active:
             self.deactivate_overlay()
@@ -121,28 +276,303 @@ class ScreenshotApp(QObject):
         if not self._overlay_active:
             self._overlay_active = True
             self.overlay_is_active = True
-            self.overlay.show_overlay()
+            with self.watchdog.stage("overlay"):
+                self.overlay.show_overlay()
 
     def deactivate_overlay(self):
+        self._scroll_pending = False
         if self._overlay_active:
             self._overlay_active = False
             self.overlay_is_active = False
             self.overlay.hide_overlay()
+            
+            if self.low_memory:
+                memreport.trim_memory()
     
     def toggle_overlay(self):
         self._handle_overlay_toggle()
 
     def _handle_region_capture(self, x: int, y: int, width: int, height: int):
+        scroll = self._scroll_pending
         self.deactivate_overlay()
         
-        image = self.screenshot_service.capture_region(x, y, width, height)
+        if scroll:
+            self._start_scroll_capture(x, y, width, height)
+            return
+        
+        self._remember_region((x, y, width, height))
+        with self.watchdog.stage("capture"):
+            image = self.screenshot_service.capture_region(x, y, width, height)
+        edited = self._edit_capture(image, (x, y))
+        if edited is not None:
+            with self.watchdog.stage("capture"):
+                self._submit_capture(
+                    edited[0], "Screenshot", edited[1], edited[2], wait=False
+                )
+
+    def _handle_fullscreen_capture(self):
+        if self._overlay_active:
+            self.deactivate_overlay()
+            
+            with self.watchdog.stage("capture"):
+                image = self.screenshot_service.capture_fullscreen()
+            edited = self._edit_capture(image, (0, 0))
+            if edited is not None:
+                with self.watchdog.stage("capture"):
+                    self._submit_capture(
+                        edited[0], "Full-screen screenshot", edited[1], edited[2], wait=False
+                    )
+
+    def _remember_region(self, region):
+        if self.config.get_last_region() == tuple(region):
+            return
+        self.config.set_last_region(region)
+        # Written later and coalesced, so a burst of captures costs one
+        # config write and none of them wait on it.
+        self._config_save_timer.start()
+
+    def _save_config_deferred(self):
+        self._config_save_timer.stop()
+        with self.watchdog.stage("config"):
+            try:
+                self.config.save_config()
+            except OSError as e:
+                logger.warning(f"Could not save last region: {e}")
+
+    def _handle_repeat_last_region(self):
+        region = self.config.get_last_region()
+        if region is None:
+            print("✗ No region captured yet")
+            return
+        self._capture_region_direct(region, "Repeated region screenshot")
+
+    def capture_preset(self, name: str) -> None:
+        p = self.config.get_region_preset(name)
+        if p is None:
+            logger.error(f"Unknown region preset '{name}'")
+            print(f"✗ Unknown region preset '{name}'")
+            return
+        self._capture_region_direct(tuple(p["region"]), f"Preset '{name}' screenshot")
+
+    def _capture_region_direct(self, region, label: str):
+        # No overlay, no editor: the grab runs off the GUI thread and the
+        # image goes straight into the capture queue.
+        self._direct_executor.submit(self._grab_and_submit, region, label)
+
+    def _grab_and_submit(self, region, label: str):
+        try:
+            image = self.screenshot_service.capture_region(*region)
+        except Exception as e:
+            logger.error(f"{label} failed: {e}")
+            print(f"✗ {label} failed: {e}")
+            return
+        self._submit_capture(image, label, tuple(region[:2]))
+
+    def _handle_scroll_capture(self):
+        if self._scroll is not None:
+            self._stop_scroll_capture()
+            return
+        
+        self._scroll_pending = True
+        self.activate_overlay()
+        print("Select the region to scroll, then scroll it; press the shortcut again to finish")
+
+    def _start_scroll_capture(self, x: int, y: int, width: int, height: int):
+        st = self.config.get_scroll_capture_settings()
+        
+        files = ExitStack()
+        with self.watchdog.stage("scroll-open"):
+            f, path = files.enter_context(self.file_manager.open_stream())
+        self._scroll = ScrollCapture(
+            f,
+            ignore_top=int(st["ignore_top"]),
+            ignore_bottom=int(st["ignore_bottom"]),
+            max_height=st["max_height"],
+        )
+        self._scroll_files = files
+        self._scroll_path = path
+        self._scroll_region = (x, y, width, height)
+        self._scroll_grab = None
+        self._scroll_timer.start(max(16, int(st["interval"] * 1000)))
+        logger.info(f"Scrolling capture started for region {self._scroll_region}")
+        print("✓ Scrolling capture started")
+
+    def _scroll_tick(self):
+        # One grab in flight at a time; a slow stitch just lowers the frame
+        # rate instead of queueing frames.
+        if self._scroll_grab is None or self._scroll_grab.done():
+            self._scroll_grab = self._grab_executor.submit(self._scroll_step)
+
+    def _scroll_step(self):
+        sc = self._scroll
+        if sc is None or sc.finished:
+            return
+        
+        st = self.config.get_scroll_capture_settings()
+        x, y, w, h = self._scroll_region
+        try:
+            frame = self.screenshot_service.capture_region(x, y, w, h)
+            if self.redactor is not None:
+                frame = self.redactor.apply(frame, (x, y))
+            sc.add_frame(frame)
+        except Exception as e:
+            logger.error(f"Scrolling capture failed: {e}")
+            self.scroll_capture_done.emit()
+            return
+        
+        if sc.unchanged >= st["idle_frames"] or sc.at_limit():
+            self.scroll_capture_done.emit()
+        elif st["auto_scroll_key"]:
+            import keyboard
+            keyboard.send(st["auto_scroll_key"])
+
+    def _stop_scroll_capture(self):
+        if self._scroll is None:
+            return
+        
+        self._scroll_timer.stop()
+        sc, files, path = self._scroll, self._scroll_files, self._scroll_path
+        self._scroll = self._scroll_files = self._scroll_path = None
+        # Runs after any grab still in flight on the same executor.
+        self._grab_executor.submit(self._finish_scroll_capture, sc, files, path)
+
+    def _finish_scroll_capture(self, sc: ScrollCapture, files: ExitStack, path: str):
+        try:
+            height = sc.finish()
+        except Exception as e:
+            files.__exit__(type(e), e, e.__traceback__)
+            logger.error(f"Failed to save scrolling capture: {e}")
+            print(f"✗ Failed to save scrolling capture: {e}")
+            return
+        files.close()
+        
+        logger.info(f"Scrolling capture saved to: {path} ({sc.frames} frames, {height}px)")
+        print(f"✓ Scrolling capture saved to: {path} ({height}px tall)")
+        if self.exporter is not None:
+            self.exporter.enqueue(path)
+        if self.low_memory:
+            memreport.trim_memory()
+
+    def _edit_capture(self, image, origin):
+        if not self.config.get_edit_before_save():
+            return image, origin, []
+        
+        from src.ui.editor import AnnotationEditor
+        
+        with self.watchdog.stage("editor"):
+            editor = AnnotationEditor(
+                pil_to_qimage(image), self.config.get_edit_history_bytes()
+            )
+            accepted = editor.exec()
+        if not accepted:
+            logger.info("Capture discarded in editor")
+            print("✗ Capture discarded")
+            return None
+        
+        dx, dy = editor.crop_offset()
+        origin = (origin[0] + dx, origin[1] + dy)
+        return qimage_to_pil(editor.result_image()), origin, editor.redactions()
+
+    def _submit_capture(self, image, label: str, origin=(0, 0), redactions=(),
+                        clipboard: bool = True, wait: bool = True) -> CaptureJob:
+        # GUI-thread callers pass wait=False: with the queue full the
+        # capture is dropped and reported rather than freezing the tray,
+        # hotkeys and overlay until a worker frees a slot.
+        kw = {} if wait else {"block_timeout": 0}
+        return self.capture_queue.submit(
+            image, callback=self.capture_finished.emit, tag=label,
+            origin=origin, redactions=redactions, clipboard=clipboard, **kw
+        )
+
+    def _handle_watch_change(self, watch: Watch, image):
+        # Called on the watcher thread with the full-resolution frame that
+        # triggered the change, so no second grab is needed.
+        self._submit_capture(
+            image, f"Watch '{watch.name}' capture", watch.region[:2], clipboard=False
+        )
+
+    def _process_capture(self, job: CaptureJob) -> str:
+        # Runs on a queue worker; redaction finishes before any bytes reach
+        # disk, and the clipboard only ever sees job.image afterwards.
+        if self.redactor is not None or job.redactions:
+            r = self.redactor or Redactor()
+            job.image = r.apply(job.image, job.origin, job.redactions)
+        filepath = self.file_manager.save_screenshot(job.image)
+        
+        if self.exporter is not None:
+            self.exporter.enqueue(filepath)
+        return filepath
+
+    def _make_scheduled_job(self, sc: Dict[str, Any]) -> ScheduledJob:
+        if "region" in sc:
+            target = {"region": [int(v) for v in sc["region"]]}
+        elif "monitor" in sc:
+            target = {"monitor": int(sc["monitor"])}
+        elif sc.get("fullscreen"):
+            target = {"fullscreen": True}
+        else:
+            raise ValueError("Schedule needs 'region', 'monitor' or 'fullscreen'")
+        
+        return ScheduledJob(
+            sc["name"], target,
+            every=sc.get("every"),
+            cron=sc.get("cron"),
+            jitter=float(sc.get("jitter", 0.0)),
+            skip_if_busy=sc.get("skip_if_busy", True),
+            count=sc.get("count"),
+        )
+
+    def _handle_scheduled_job(self, job: ScheduledJob):
+        # Grabbing off the GUI thread keeps the event loop responsive when
+        # many jobs fire together. job.running stays set until the capture
+        # is queued, so a slow job is skipped instead of piling up grabs.
+        job.running = True
+        self._grab_executor.submit(self._run_scheduled_job, job)
+
+    def _run_scheduled_job(self, job: ScheduledJob):
+        try:
+            self._capture_scheduled(job)
+        finally:
+            job.running = False
+
+    def _capture_scheduled(self, job: ScheduledJob):
+        t = job.target
+        try:
+            if "region" in t:
+                image = self.screenshot_service.capture_region(*t["region"])
+                origin = tuple(t["region"][:2])
+            elif "monitor" in t:
+                image = self.screenshot_service.capture_monitor(t["monitor"])
+                mons = self.screenshot_service.get_monitors()
+                origin = mons[t["monitor"]][:2] if t["monitor"] < len(mons) else (0, 0)
+            else:
+                image = self.screenshot_service.capture_fullscreen()
+                origin = (0, 0)
+        except Exception as e:
+            logger.error(f"Scheduled capture '{job.name}' failed: {e}")
+            return
+        
+        self._submit_capture(image, f"Scheduled '{job.name}' capture", origin, clipboard=False)
+
+    def _on_capture_finished(self, job: CaptureJob):
+        if job.status == "dropped":
+            logger.warning(f"{job.tag} dropped: capture queue is full")
+            print(f"✗ {job.tag} dropped (capture queue full)")
+            return
+        
+        if job.status != "done":
+            logger.error(f"Failed to save {job.tag.lower()}: {job.error}")
+            print(f"✗ Failed to save {job.tag.lower()}: {job.error}")
+            job.image = None
+            return
         
-        filepath = self.file_manager.save_screenshot(image)
-        logger.info(f"Screenshot saved to: {filepath}")
-        print(f"✓ Screenshot saved to: {filepath}")
+        filepath = job.result
+        logger.info(f"{job.tag} saved to: {filepath}")
+        print(f"✓ {job.tag} saved to: {filepath}")
         
-        if self.config.get_auto_save_clipboard():
-            clipboard_success = self.clipboard_manager.copy_image_to_clipboard(image)
+        if job.clipboard and self.config.get_auto_save_clipboard():
+            with self.watchdog.stage("clipboard"):
+                clipboard_success = self.clipboard_manager.copy_image_to_clipboard(job.image)
             
             if clipboard_success:
                 logger.info("Image copied to clipboard successfully")
@@ -150,38 +580,190 @@ class ScreenshotApp(QObject):
             else:
                 logger.error("Failed to copy image to clipboard, but file was saved successfully")
                 print("✗ Failed to copy to clipboard")
+        
+        job.image = None
+        
+        if self.low_memory and job.nbytes >= LARGE_CAPTURE_BYTES:
+            memreport.trim_memory()
 
-    def _handle_fullscreen_capture(self):
-        if self._overlay_active:
-            self.deactivate_overlay()
-            
-            image = self.screenshot_service.capture_fullscreen()
-            
-            filepath = self.file_manager.save_screenshot(image)
-            logger.info(f"Full-screen screenshot saved to: {filepath}")
-            print(f"✓ Full-screen screenshot saved to: {filepath}")
-            
-            if self.config.get_auto_save_clipboard():
-                clipboard_success = self.clipboard_manager.copy_image_to_clipboard(image)
-                
-                if clipboard_success:
-                    logger.info("Image copied to clipboard successfully")
-                    print("✓ Image copied to clipboard")
-                else:
-                    logger.error("Failed to copy image to clipboard, but file was saved successfully")
-                    print("✗ Failed to copy to clipboard")
+    def memory_report(self) -> Dict[str, Any]:
+        return memreport.memory_report({
+            "capture_queue": lambda: self.capture_queue.stats()["bytes_in_flight"],
+            "clipboard_image": self.clipboard_manager.last_image_bytes,
+            "overlay_frame": self.overlay.frame_bytes,
+        })
+
+    def show_memory_report(self):
+        rep = memreport.format_report(self.memory_report())
+        logger.info(rep)
+        print(rep)
+
+    def show_stall_reports(self):
+        rep = format_reports(self.watchdog.report_dicts())
+        logger.info(rep)
+        print(rep)
+
+    def export_stall_reports(self) -> str:
+        path = self.watchdog.export(self.config.get_stall_report_path())
+        logger.info(f"Stall reports exported to: {path}")
+        print(f"✓ Stall reports exported to: {path}")
+        return path
+
+    def _ipc_handlers(self) -> Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]]:
+        return {
+            "capture_region": self._ipc_capture_region,
+            "capture_fullscreen": self._ipc_capture_fullscreen,
+            "capture_monitor": self._ipc_capture_monitor,
+            "capture_preset": self._ipc_capture_preset,
+            "capture_last_region": self._ipc_capture_last_region,
+            "status": self._ipc_status,
+            "stats": self._ipc_stats,
+            "memory": self._ipc_memory,
+            "stalls": self._ipc_stalls,
+        }
+
+    def _capture_to_file(self, grab: Callable, origin=(0, 0)) -> Dict[str, Any]:
+        image = grab()
+        w, h = image.width, image.height
+        filepath = self.capture_queue.submit(image, tag="IPC screenshot", origin=origin).wait()
+        logger.info(f"IPC screenshot saved to: {filepath}")
+        return {"path": filepath, "width": w, "height": h}
+
+    def _ipc_capture_region(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        x, y = int(args["x"]), int(args["y"])
+        w, h = int(args["width"]), int(args["height"])
+        if w <= 0 or h <= 0:
+            raise ValueError("Region width and height must be positive")
+        return self._capture_to_file(
+            lambda: self.screenshot_service.capture_region(x, y, w, h), (x, y)
+        )
+
+    def _ipc_capture_fullscreen(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        return self._capture_to_file(self.screenshot_service.capture_fullscreen)
+
+    def _ipc_capture_monitor(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        idx = int(args.get("index", 0))
+        mons = self.screenshot_service.get_monitors()
+        origin = mons[idx][:2] if 0 <= idx < len(mons) else (0, 0)
+        return self._capture_to_file(
+            lambda: self.screenshot_service.capture_monitor(idx), origin
+        )
+
+    def _ipc_capture_preset(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        name = str(args["name"])
+        p = self.config.get_region_preset(name)
+        if p is None:
+            raise ValueError(f"Unknown region preset '{name}'")
+        x, y, w, h = p["region"]
+        return self._capture_to_file(
+            lambda: self.screenshot_service.capture_region(x, y, w, h), (x, y)
+        )
+
+    def _ipc_capture_last_region(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        region = self.config.get_last_region()
+        if region is None:
+            raise ValueError("No region captured yet")
+        return self._capture_to_file(
+            lambda: self.screenshot_service.capture_region(*region), region[:2]
+        )
+
+    def _ipc_status(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "version": __version__,
+            "pid": os.getpid(),
+            "overlay_active": self._overlay_active,
+            "directory": str(self.file_manager.screenshot_directory),
+            "monitors": len(self.screenshot_service.get_monitors()),
+        }
+
+    def _ipc_stats(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        st = self.ipc_server.stats() if self.ipc_server else {}
+        st["capture_queue"] = self.capture_queue.stats()
+        st["writes"] = self.file_manager.write_stats()
+        if self.exporter is not None:
+            st["export"] = self.exporter.stats()
+        st["watches"] = self.watcher.stats()
+        st["schedules"] = self.scheduler.stats()
+        st["stalls"] = self.watchdog.stats()
+        if self.recompressor is not None:
+            st["recompression"] = self.recompressor.stats()
+        return st
+
+    def _ipc_memory(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        return self.memory_report()
+
+    def _ipc_stalls(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        if args.get("export"):
+            return {"path": self.watchdog.export(self.config.get_stall_report_path())}
+        # Only the dominant stack per report, to stay under the IPC
+        # message limit; the export has everything.
+        return {
+            "stats": self.watchdog.stats(),
+            "reports": self.watchdog.report_dicts(limit=int(args.get("limit", 20)), max_stacks=1),
+        }
+
+    def _update_monitors(self):
+        mons = []
+        for scr in QApplication.screens():
+            # geometry() is in logical pixels; grabs take physical ones.
+            g = scr.geometry()
+            dpr = scr.devicePixelRatio()
+            mons.append((int(g.x() * dpr), int(g.y() * dpr),
+                         int(g.width() * dpr), int(g.height() * dpr)))
+        self.screenshot_service.set_monitors(mons)
 
     def start(self):
         self.file_manager.ensure_directory_exists()
         
+        self._update_monitors()
+        
+        self.capture_queue.start()
+        
+        if self.exporter is not None:
+            self.exporter.start()
+        
+        self.watcher.start()
+        self.scheduler.start()
+        
+        if self.recompressor is not None:
+            self.recompressor.start()
+        
+        if self._watchdog_enabled:
+            self.watchdog.start()
+        
         self.keybind_manager.start_listening()
         
+        if self.ipc_server:
+            self.ipc_server.start()
+        
         print("Swip started")
         print(f"Press {self.config.get_keybind('overlay_toggle')} to toggle overlay")
         print(f"Press {self.config.get_keybind('fullscreen_capture')} for full-screen capture (when overlay is active)")
+        print(f"Press {self.config.get_keybind('scroll_capture')} for a scrolling capture")
+        print(f"Press {self.config.get_keybind('repeat_last_region')} to capture the last region again")
 
     def stop(self):
         self.keybind_manager.stop_listening()
+        self.watchdog.stop()
+        if self._config_save_timer.isActive():
+            self._save_config_deferred()
+        
+        self._stop_scroll_capture()
+        self.watcher.stop()
+        self.scheduler.stop()
+        if self.recompressor is not None:
+            self.recompressor.stop()
+        self._grab_executor.shutdown(wait=True)
+        self._direct_executor.shutdown(wait=True)
+        
+        if self.ipc_server:
+            self.ipc_server.stop()
+        
+        self.capture_queue.stop()
+        self.file_manager.close()
+        
+        if self.exporter is not None:
+            self.exporter.stop()
         
         if self._overlay_active:
             self.deactivate_overlay()
@@ -189,22 +771,20 @@ class ScreenshotApp(QObject):
         print("Swip stopped")
     
     def show_settings(self):
-        dialog = SettingsDialog(self.config)
-        dialog.settings_saved.connect(self._handle_settings_saved)
-        dialog.exec()
+        with self.watchdog.stage("settings"):
+            dialog = SettingsDialog(self.config)
+            dialog.settings_saved.connect(self._handle_settings_saved)
+            dialog.exec()
     
     def _handle_settings_saved(self, new_keybinds: dict):
-        action_callbacks = {
-            "overlay_toggle": self._handle_overlay_toggle,
-            "fullscreen_capture": self._handle_fullscreen_capture,
-        }
-        
-        self.keybind_manager.reload_keybinds(action_callbacks)
+        self.keybind_manager.reload_keybinds(self._keybind_callbacks())
         
         logger.info("Keybinds updated successfully")
         print("Keybinds updated successfully")
         print(f"Press {self.config.get_keybind('overlay_toggle')} to toggle overlay")
         print(f"Press {self.config.get_keybind('fullscreen_capture')} for full-screen capture (when overlay is active)")
+        print(f"Press {self.config.get_keybind('scroll_capture')} for a scrolling capture")
+        print(f"Press {self.config.get_keybind('repeat_last_region')} to capture the last region again")
     
     def _quit_application(self):
         self.stop()
@@ -0,0 +1,91 @@
+import argparse
+import json
+import sys
+
+from src.utils.config import ConfigManager
+from src.utils.ipc import IPCError, send_request
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="swip-cli",
+        description="Send capture requests to a running Swip instance",
+    )
+    p.add_argument("--socket", help="Path to the Swip IPC socket")
+    p.add_argument("--timeout", type=float, default=30.0)
+    p.add_argument("--json", action="store_true", help="Print the raw JSON response")
+
+    sub = p.add_subparsers(dest="command", required=True)
+
+    r = sub.add_parser("region", help="Capture a screen region")
+    r.add_argument("x", type=int)
+    r.add_argument("y", type=int)
+    r.add_argument("width", type=int)
+    r.add_argument("height", type=int)
+
+    sub.add_parser("fullscreen", help="Capture the full screen")
+
+    m = sub.add_parser("monitor", help="Capture a single monitor")
+    m.add_argument("index", type=int)
+
+    pr = sub.add_parser("preset", help="Capture a saved region preset")
+    pr.add_argument("name")
+
+    sub.add_parser("last", help="Capture the last selected region again")
+
+    sub.add_parser("status", help="Show daemon status")
+    sub.add_parser("stats", help="Show daemon request statistics")
+    sub.add_parser("memory", help="Show daemon memory usage by component")
+    st = sub.add_parser("stalls", help="Show recent GUI event loop stalls")
+    st.add_argument("--export", action="store_true",
+                    help="Write all kept reports to a JSON file and print its path")
+
+    return p
+
+
+def _to_request(ns: argparse.Namespace):
+    if ns.command == "region":
+        return "capture_region", {
+            "x": ns.x, "y": ns.y, "width": ns.width, "height": ns.height
+        }
+    if ns.command == "fullscreen":
+        return "capture_fullscreen", {}
+    if ns.command == "monitor":
+        return "capture_monitor", {"index": ns.index}
+    if ns.command == "preset":
+        return "capture_preset", {"name": ns.name}
+    if ns.command == "last":
+        return "capture_last_region", {}
+    if ns.command == "stalls":
+        return "stalls", {"export": ns.export}
+    return ns.command, {}
+
+
+def main(argv=None) -> int:
+    ns = _build_parser().parse_args(argv)
+
+    sock = ns.socket or ConfigManager().get_ipc_socket_path()
+    cmd, args = _to_request(ns)
+
+    try:
+        resp = send_request(cmd, args, socket_path=sock, timeout=ns.timeout)
+    except IPCError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 2
+
+    if ns.json:
+        print(json.dumps(resp, indent=2))
+    elif not resp.get("ok"):
+        print(f"✗ {resp.get('error')}", file=sys.stderr)
+    elif "path" in resp:
+        print(resp["path"])
+    else:
+        print(json.dumps(resp, indent=2))
+
+    if not resp.get("ok"):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
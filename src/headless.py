@@ -0,0 +1,262 @@
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.services.capturequeue import CaptureJob, CaptureQueue
+from src.services.filemanager import FileManager, FORMAT_EXTENSIONS
+from src.services.redaction import Redactor
+from src.services.screenshot import ScreenshotCapture
+from src.utils.config import ConfigManager
+
+
+logger = logging.getLogger(__name__)
+
+
+class BatchSpecError(ValueError):
+    pass
+
+
+class BatchRunner:
+
+    def __init__(self, spec: Dict[str, Any], config: Optional[ConfigManager] = None):
+        self.config = config or ConfigManager()
+        self.spec = spec
+
+        self.image_format = str(spec.get("format", "png")).upper()
+        if self.image_format == "JPG":
+            self.image_format = "JPEG"
+        if self.image_format not in FORMAT_EXTENSIONS:
+            raise BatchSpecError(f"Unsupported output format: {spec.get('format')}")
+
+        self.concurrency = int(spec.get("concurrency", 2))
+        if self.concurrency < 1:
+            raise BatchSpecError("'concurrency' must be at least 1")
+
+        self.captures = [self._parse_capture(c) for c in spec.get("captures", [])]
+        if not self.captures:
+            raise BatchSpecError("Batch spec has no captures")
+
+        self.screenshot_service = ScreenshotCapture()
+        monitors = spec.get("monitors")
+        if monitors:
+            self.screenshot_service.set_monitors([tuple(m) for m in monitors])
+
+        self.file_manager = FileManager.from_config(
+            self.config, spec.get("output_directory")
+        )
+
+        # Block policy: at most 2 * concurrency frames are grabbed but not yet on disk.
+        self.capture_queue = CaptureQueue(
+            self._save,
+            max_jobs=self.concurrency * 2,
+            max_bytes=int(spec.get("max_bytes", self.config.get_capture_queue_settings()["max_bytes"])),
+            policy="block",
+            workers=self.concurrency,
+        )
+
+        rs = self.config.get_redaction_settings()
+        if "redaction" in spec:
+            rs.update(spec["redaction"])
+        self.redactor = Redactor.from_settings(rs)
+
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.saved: List[str] = []
+        self.errors = 0
+
+    def _parse_capture(self, c: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(c, dict):
+            raise BatchSpecError(f"Invalid capture entry: {c!r}")
+
+        if "preset" in c:
+            pr = self.config.get_region_preset(c["preset"])
+            if pr is None:
+                raise BatchSpecError(f"Unknown region preset: {c['preset']!r}")
+            c = dict(c, region=pr["region"])
+
+        if "region" in c:
+            r = c["region"]
+            if len(r) != 4 or r[2] <= 0 or r[3] <= 0:
+                raise BatchSpecError(f"Invalid region: {r!r}")
+            kind, arg = "region", tuple(int(v) for v in r)
+        elif "monitor" in c:
+            kind, arg = "monitor", int(c["monitor"])
+        elif c.get("fullscreen"):
+            kind, arg = "fullscreen", None
+        else:
+            raise BatchSpecError(f"Capture needs 'region', 'monitor' or 'fullscreen': {c!r}")
+
+        count = int(c.get("count", 1))
+        interval = float(c.get("interval", 0.0))
+        if count < 1 or interval < 0:
+            raise BatchSpecError(f"Invalid count/interval in {c!r}")
+
+        return {
+            "kind": kind,
+            "arg": arg,
+            "count": count,
+            "interval": interval,
+            "delay": float(c.get("delay", 0.0)),
+        }
+
+    def _timeline(self) -> List[Tuple[float, int]]:
+        ev = []
+        for i, c in enumerate(self.captures):
+            for n in range(c["count"]):
+                ev.append((c["delay"] + n * c["interval"], i))
+        ev.sort()
+        return ev
+
+    def _grab(self, c: Dict[str, Any]):
+        if c["kind"] == "region":
+            return self.screenshot_service.capture_region(*c["arg"])
+        if c["kind"] == "monitor":
+            return self.screenshot_service.capture_monitor(c["arg"])
+        return self.screenshot_service.capture_fullscreen()
+
+    def _origin(self, c: Dict[str, Any]) -> Tuple[int, int]:
+        if c["kind"] == "region":
+            return c["arg"][:2]
+        if c["kind"] == "monitor":
+            mons = self.screenshot_service.get_monitors()
+            if 0 <= c["arg"] < len(mons):
+                return mons[c["arg"]][:2]
+        return 0, 0
+
+    def _save(self, job: CaptureJob) -> str:
+        if self.redactor is not None:
+            job.image = self.redactor.apply(job.image, job.origin)
+        return self.file_manager.save_screenshot(job.image, image_format=self.image_format)
+
+    def _on_saved(self, job: CaptureJob) -> None:
+        with self._lock:
+            if job.status == "done":
+                self.saved.append(job.result)
+                print(job.result, flush=True)
+            else:
+                self.errors += 1
+        job.image = None
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self) -> Dict[str, Any]:
+        self.file_manager.ensure_directory_exists()
+
+        self.capture_queue.start()
+        t0 = time.monotonic()
+        try:
+            for at, i in self._timeline():
+                wait = t0 + at - time.monotonic()
+                if wait > 0 and self._stop.wait(wait):
+                    break
+                if self._stop.is_set():
+                    break
+
+                try:
+                    image = self._grab(self.captures[i])
+                except Exception as e:
+                    logger.error(f"Capture failed: {e}")
+                    with self._lock:
+                        self.errors += 1
+                    continue
+
+                self.capture_queue.submit(
+                    image, callback=self._on_saved, origin=self._origin(self.captures[i])
+                )
+                del image
+        finally:
+            self.capture_queue.stop()
+            self.file_manager.close()
+
+        return {
+            "saved": len(self.saved),
+            "errors": self.errors,
+            "writes": self.file_manager.write_stats(),
+            "elapsed_s": round(time.monotonic() - t0, 3),
+        }
+
+
+def _parse_region(s: str) -> List[int]:
+    try:
+        r = [int(v) for v in s.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid region '{s}', expected x,y,w,h")
+    if len(r) != 4:
+        raise argparse.ArgumentTypeError(f"Invalid region '{s}', expected x,y,w,h")
+    return r
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="swip-headless",
+        description="Capture screenshots without starting the GUI",
+    )
+    p.add_argument("spec", nargs="?", help="Path to a JSON batch spec ('-' for stdin)")
+    p.add_argument("--region", type=_parse_region, action="append",
+                   help="Region as x,y,w,h (repeatable)")
+    p.add_argument("--preset", action="append",
+                   help="Name of a saved region preset (repeatable)")
+    p.add_argument("--fullscreen", action="store_true")
+    p.add_argument("--count", type=int, default=1)
+    p.add_argument("--interval", type=float, default=0.0)
+    p.add_argument("--format", default=None)
+    p.add_argument("--concurrency", type=int, default=None)
+    p.add_argument("--output", help="Output directory")
+    return p
+
+
+def _spec_from_args(ns: argparse.Namespace) -> Dict[str, Any]:
+    if ns.spec:
+        if ns.spec == "-":
+            spec = json.load(sys.stdin)
+        else:
+            with open(ns.spec, "r") as f:
+                spec = json.load(f)
+    else:
+        spec = {"captures": []}
+
+    common = {"count": ns.count, "interval": ns.interval}
+    for r in ns.region or []:
+        spec["captures"].append(dict(common, region=r))
+    for name in ns.preset or []:
+        spec["captures"].append(dict(common, preset=name))
+    if ns.fullscreen:
+        spec["captures"].append(dict(common, fullscreen=True))
+
+    if ns.format:
+        spec["format"] = ns.format
+    if ns.concurrency:
+        spec["concurrency"] = ns.concurrency
+    if ns.output:
+        spec["output_directory"] = ns.output
+    return spec
+
+
+def main(argv=None) -> int:
+    ns = _build_parser().parse_args(argv)
+
+    try:
+        runner = BatchRunner(_spec_from_args(ns))
+    except (BatchSpecError, OSError, ValueError, TypeError, KeyError) as e:
+        print(f"✗ Invalid batch spec: {e}", file=sys.stderr)
+        return 2
+
+    signal.signal(signal.SIGINT, lambda *_: runner.stop())
+    signal.signal(signal.SIGTERM, lambda *_: runner.stop())
+
+    res = runner.run()
+    print(f"✓ {res['saved']} screenshot(s) saved in {res['elapsed_s']}s", file=sys.stderr)
+    if res["errors"]:
+        print(f"✗ {res['errors']} capture(s) failed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,10 @@
-from .clipboard import ClipboardManager
-
 __all__ = ['ClipboardManager']
+
+
+def __getattr__(name):
+    # Imported lazily so Qt-free entry points (headless, cli) can use the
+    # other services without pulling in PyQt6.
+    if name == 'ClipboardManager':
+        from .clipboard import ClipboardManager
+        return ClipboardManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,197 @@
+import ctypes
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Set, Tuple, Union
+
+from src.utils.atomicfile import fsync_dir, temp_path_for
+
+
+logger = logging.getLogger(__name__)
+
+
+POLICIES = ("none", "file", "batch")
+
+
+class _Timing:
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.last_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.last_ms = ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "last_ms": round(self.last_ms, 3),
+        }
+
+
+# Exactly what temp_path_for() produces: .<name>.<ext>.<pid>.tmp
+_TEMP_RE = re.compile(r'^\.(.+\.[A-Za-z0-9]+)\.(\d+)\.tmp$')
+
+
+def parse_temp_name(name: str) -> Optional[Tuple[str, int]]:
+    m = _TEMP_RE.match(name)
+    if m is None:
+        return None
+    return m.group(1), int(m.group(2))
+
+
+def is_temp_name(name: str) -> bool:
+    return parse_temp_name(name) is not None
+
+
+def pid_alive(pid: int) -> bool:
+    if pid <= 0:
+        return False
+    if sys.platform == "win32":
+        # os.kill(pid, 0) would send CTRL_C_EVENT on Windows.
+        try:
+            k32 = ctypes.windll.kernel32
+            h = k32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+            if not h:
+                return False
+            try:
+                code = ctypes.c_ulong()
+                k32.GetExitCodeProcess(h, ctypes.byref(code))
+                return code.value == 259  # STILL_ACTIVE
+            finally:
+                k32.CloseHandle(h)
+        except (OSError, AttributeError):
+            return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class AtomicWriter:
+
+    def __init__(self, policy: str = "none", batch_interval: float = 1.0):
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid durability policy: '{policy}'. Valid policies: {', '.join(POLICIES)}")
+
+        self.policy = policy
+        self.batch_interval = batch_interval
+        self._lock = threading.Lock()
+        self._pending: Set[Path] = set()
+        self._timer: Union[threading.Timer, None] = None
+        self._write = _Timing()
+        self._fsync = _Timing()
+        self._failed = 0
+
+    @contextmanager
+    def open(self, path: Union[str, Path]) -> Iterator[BinaryIO]:
+        path = Path(path)
+        tmp = temp_path_for(path)
+        fs_ms = 0.0
+        t0 = time.perf_counter()
+
+        try:
+            with open(tmp, "wb") as f:
+                yield f
+                f.flush()
+                w_ms = (time.perf_counter() - t0) * 1000.0
+                if self.policy == "file":
+                    t1 = time.perf_counter()
+                    os.fsync(f.fileno())
+                    fs_ms = (time.perf_counter() - t1) * 1000.0
+            os.replace(tmp, path)
+        except BaseException:
+            with self._lock:
+                self._failed += 1
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+        if self.policy == "file":
+            t1 = time.perf_counter()
+            fsync_dir(path.parent)
+            fs_ms += (time.perf_counter() - t1) * 1000.0
+        elif self.policy == "batch":
+            self._schedule(path)
+
+        with self._lock:
+            self._write.add(w_ms)
+            if self.policy == "file":
+                self._fsync.add(fs_ms)
+
+    def _schedule(self, path: Path) -> None:
+        with self._lock:
+            self._pending.add(path)
+            if self._timer is None:
+                self._timer = threading.Timer(self.batch_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            pending = self._pending
+            self._pending = set()
+            self._timer = None
+
+        if not pending:
+            return
+
+        t0 = time.perf_counter()
+        dirs = set()
+        for p in pending:
+            try:
+                fd = os.open(p, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.fsync(fd)
+            except OSError as e:
+                logger.warning(f"fsync failed for {p}: {e}")
+            finally:
+                os.close(fd)
+            dirs.add(p.parent)
+
+        for d in dirs:
+            try:
+                fsync_dir(d)
+            except OSError as e:
+                logger.warning(f"fsync failed for {d}: {e}")
+
+        with self._lock:
+            self._fsync.add((time.perf_counter() - t0) * 1000.0)
+
+    def close(self) -> None:
+        with self._lock:
+            t = self._timer
+            self._timer = None
+        if t is not None:
+            t.cancel()
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "policy": self.policy,
+                "write": self._write.as_dict(),
+                "fsync": self._fsync.as_dict(),
+                "pending_fsync": len(self._pending),
+                "failed": self._failed,
+            }
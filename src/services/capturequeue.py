@@ -0,0 +1,236 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from PIL.Image import Image
+
+
+logger = logging.getLogger(__name__)
+
+
+POLICIES = ("block", "drop_oldest", "drop_newest", "coalesce")
+
+# submit(block_timeout=...) default: use the queue's own block_timeout.
+_QUEUE_TIMEOUT = object()
+
+
+class CaptureJob:
+
+    def __init__(self, image: Image, callback: Optional[Callable[["CaptureJob"], None]] = None,
+                 tag: Any = None, origin: Tuple[int, int] = (0, 0),
+                 redactions: Sequence[Sequence[int]] = (), clipboard: bool = True):
+        self.image: Optional[Image] = image
+        self.nbytes = image.width * image.height * len(image.getbands())
+        self.callback = callback
+        self.tag = tag
+        self.origin = origin
+        self.redactions = list(redactions)
+        self.clipboard = clipboard
+        self.status = "pending"
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.submitted_at = time.monotonic()
+        self._done = threading.Event()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> str:
+        if not self._done.wait(timeout):
+            raise TimeoutError("Capture job did not finish in time")
+        if self.status == "failed":
+            raise self.error
+        if self.status != "done":
+            raise RuntimeError(f"Capture job was {self.status}")
+        return self.result
+
+    def _finish(self, status: str, result: Optional[str] = None,
+                error: Optional[BaseException] = None) -> None:
+        self.status = status
+        self.result = result
+        self.error = error
+        self._done.set()
+        if self.callback is not None:
+            try:
+                self.callback(self)
+            except Exception as e:
+                logger.error(f"Capture job callback failed: {e}")
+
+
+class CaptureQueue:
+
+    def __init__(self, process: Callable[[CaptureJob], str], max_jobs: int = 8,
+                 max_bytes: int = 512 * 1024 * 1024, policy: str = "block",
+                 workers: int = 2, block_timeout: Optional[float] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid queue policy: '{policy}'. Valid policies: {', '.join(POLICIES)}")
+        if max_jobs < 1 or workers < 1:
+            raise ValueError("max_jobs and workers must be at least 1")
+
+        self._process = process
+        self.max_jobs = max_jobs
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+        self._pending: Deque[CaptureJob] = deque()
+        self._cond = threading.Condition()
+        self._n_workers = workers
+        self._threads: List[threading.Thread] = []
+        self._running = False
+
+        self._queued_bytes = 0
+        self._active_bytes = 0
+        self._active = 0
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "dropped_oldest": 0,
+            "dropped_newest": 0,
+            "coalesced": 0,
+        }
+        self._peak_bytes = 0
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+
+        for i in range(self._n_workers):
+            t = threading.Thread(target=self._worker, name=f"swip-capture-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, wait: bool = True) -> None:
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+
+        if wait:
+            for t in self._threads:
+                t.join()
+        self._threads = []
+
+    def _fits(self, job: CaptureJob) -> bool:
+        # Bytes held by jobs being saved count too. Only a completely idle
+        # queue accepts a job bigger than max_bytes on its own, otherwise
+        # such a capture could never be taken.
+        if not self._pending and not self._active:
+            return True
+        return (len(self._pending) < self.max_jobs
+                and self._queued_bytes + self._active_bytes + job.nbytes <= self.max_bytes)
+
+    def submit(self, image: Image, callback: Optional[Callable[[CaptureJob], None]] = None,
+               tag: Any = None, origin: Tuple[int, int] = (0, 0),
+               redactions: Sequence[Sequence[int]] = (), clipboard: bool = True,
+               block_timeout: Any = _QUEUE_TIMEOUT) -> CaptureJob:
+        # drop_oldest and coalesce always keep the newest job, so while
+        # other jobs are still saving they can exceed max_bytes by that one
+        # job. Pass block_timeout=0 from threads that must never wait (the
+        # GUI); the job is then dropped instead.
+        if block_timeout is _QUEUE_TIMEOUT:
+            block_timeout = self.block_timeout
+        job = CaptureJob(image, callback, tag, origin, redactions, clipboard)
+        dropped: List[CaptureJob] = []
+
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("Capture queue is not running")
+
+            self._counters["submitted"] += 1
+
+            if not self._fits(job):
+                if self.policy == "drop_newest":
+                    self._counters["dropped_newest"] += 1
+                    dropped.append(job)
+                    job = None
+                elif self.policy == "drop_oldest":
+                    while self._pending and not self._fits(job):
+                        old = self._pending.popleft()
+                        self._queued_bytes -= old.nbytes
+                        self._counters["dropped_oldest"] += 1
+                        dropped.append(old)
+                elif self.policy == "coalesce":
+                    while self._pending:
+                        old = self._pending.popleft()
+                        self._queued_bytes -= old.nbytes
+                        self._counters["coalesced"] += 1
+                        dropped.append(old)
+                else:
+                    deadline = None
+                    if block_timeout is not None:
+                        deadline = time.monotonic() + block_timeout
+                    while self._running and not self._fits(job):
+                        rem = None if deadline is None else deadline - time.monotonic()
+                        if rem is not None and rem <= 0:
+                            break
+                        self._cond.wait(rem)
+                    if not self._fits(job) or not self._running:
+                        self._counters["dropped_newest"] += 1
+                        dropped.append(job)
+                        job = None
+
+            if job is not None:
+                self._pending.append(job)
+                self._queued_bytes += job.nbytes
+                self._peak_bytes = max(self._peak_bytes, self._queued_bytes + self._active_bytes)
+                self._cond.notify()
+
+        for d in dropped:
+            d.image = None
+            d._finish("dropped")
+            logger.warning("Capture dropped: queue full")
+
+        return job if job is not None else dropped[0]
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._pending:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+
+                job = self._pending.popleft()
+                self._queued_bytes -= job.nbytes
+                self._active_bytes += job.nbytes
+                self._active += 1
+
+            status, result, error = "done", None, None
+            try:
+                result = self._process(job)
+            except Exception as e:
+                logger.error(f"Capture job failed: {e}")
+                status, error = "failed", e
+
+            with self._cond:
+                self._active_bytes -= job.nbytes
+                self._active -= 1
+                self._counters["completed" if status == "done" else "failed"] += 1
+                self._cond.notify_all()
+
+            job._finish(status, result, error)
+
+    def is_busy(self) -> bool:
+        with self._cond:
+            return bool(self._pending) or self._active > 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            st = dict(self._counters)
+            st.update({
+                "policy": self.policy,
+                "depth": len(self._pending),
+                "active": self._active,
+                "bytes_in_flight": self._queued_bytes + self._active_bytes,
+                "peak_bytes": self._peak_bytes,
+                "max_jobs": self.max_jobs,
+                "max_bytes": self.max_bytes,
+            })
+        return st
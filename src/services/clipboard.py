@@ -12,9 +12,10 @@ logger = logging.getLogger(__name__)
 
 class ClipboardManager:
     
-    def __init__(self):
+    def __init__(self, retain_last_image: bool = True):
         self._clipboard: Optional[QClipboard] = None
         self.cb = None
+        self.retain_last_image = retain_last_image
     
     def _get_clipboard(self) -> Optional[QClipboard]:
         if self._clipboard is None:
@@ -50,7 +51,7 @@ class ClipboardManager:
                 return False
             
             clipboard.setImage(qimg)
-            self.cb = qimg
+            self.cb = qimg if self.retain_last_image else clipboard
             logger.info("Image copied to clipboard successfully")
             return True
             
@@ -58,6 +59,11 @@ class ClipboardManager:
             logger.error(f"Failed to copy image to clipboard: {e}")
             return False
     
+    def last_image_bytes(self) -> int:
+        if isinstance(self.cb, QImage):
+            return self.cb.sizeInBytes()
+        return 0
+    
     def clear_clipboard(self) -> bool:
         try:
             cb = self._get_clipboard()
@@ -0,0 +1,78 @@
+from PIL import Image
+
+from src.utils.optional import optional_import
+
+
+_BAND_ROWS = 512
+
+
+def _packed(np, img: Image.Image):
+    return np.frombuffer(img.tobytes('raw', 'RGBX'), dtype=np.uint32)
+
+
+def _index_numpy(np, src: Image.Image, rgb: list):
+    pal = Image.new('RGB', (len(rgb), 1))
+    pal.putdata(rgb)
+    keys = _packed(np, pal)
+
+    # Multiplicative hash into a 64K lookup table; with <= 256 colors a
+    # collision-free multiplier turns up within a couple of tries.
+    for i in range(1, 64):
+        mul = np.uint32((0x9E3779B1 * i) & 0xffffffff)
+        slots = (keys * mul) >> np.uint32(16)
+        if len(np.unique(slots)) == len(keys):
+            break
+    else:
+        return None
+
+    lut = np.zeros(1 << 16, dtype=np.uint8)
+    lut[slots] = np.arange(len(keys), dtype=np.uint8)
+
+    w, h = src.size
+    idx = np.empty(w * h, dtype=np.uint8)
+    for y in range(0, h, _BAND_ROWS):
+        p = _packed(np, src.crop((0, y, w, min(y + _BAND_ROWS, h)))) * mul
+        p >>= np.uint32(16)
+        idx[y * w:y * w + len(p)] = lut[p]
+
+    out = Image.frombuffer('P', (w, h), idx, 'raw', 'P', 0, 1)
+    out.putpalette([c for px in rgb for c in px])
+    return out
+
+
+def reduce_colors(image: Image.Image, max_colors: int = 256, sample_size: int = 64) -> Image.Image:
+    if image.mode == 'RGBA':
+        if image.getextrema()[3][0] != 255:
+            return image
+        src = image.convert('RGB')
+    elif image.mode == 'RGB':
+        src = image
+    else:
+        return image
+
+    w, h = src.size
+    if w * h > sample_size * sample_size:
+        # Photographic content blows past max_colors within a few thousand
+        # pixels, so a nearest-neighbour sample rejects it almost for free.
+        smp = src.resize((sample_size, sample_size), Image.Resampling.NEAREST)
+        if smp.getcolors(max_colors) is None:
+            return image
+
+    # getcolors bails out as soon as it sees more than max_colors colors.
+    colors = src.getcolors(max_colors)
+    if colors is None:
+        return image
+
+    rgb = [c for _, c in colors]
+
+    if len(rgb) > 16 and all(r == g == b for r, g, b in rgb):
+        return src.convert('L')
+
+    np = optional_import('numpy')
+    if np is not None:
+        out = _index_numpy(np, src, rgb)
+        if out is not None:
+            return out
+
+    # Median cut is exact when the palette has room for every color.
+    return src.quantize(len(rgb), method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
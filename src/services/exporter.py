@@ -0,0 +1,362 @@
+import http.client
+import logging
+import os
+import random
+import shlex
+import shutil
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+logger = logging.getLogger(__name__)
+
+
+TARGET_TYPES = ("http", "command", "directory")
+
+
+class DeliveryError(Exception):
+
+    def __init__(self, message: str, retry: bool = True):
+        super().__init__(message)
+        self.retry = retry
+
+
+class _ConnectionPool:
+
+    def __init__(self, timeout: float, max_idle: int = 4):
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, scheme: str, host: str, port: int) -> Tuple[http.client.HTTPConnection, bool]:
+        # Returns the connection and whether it was reused from the pool.
+        key = (scheme, host, port)
+        with self._lock:
+            conns = self._idle.get(key)
+            if conns:
+                return conns.pop(), True
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(host, port, timeout=self.timeout), False
+
+    def release(self, scheme: str, host: str, port: int, conn: http.client.HTTPConnection) -> None:
+        key = (scheme, host, port)
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            if len(conns) < self.max_idle:
+                conns.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for c in conns:
+                c.close()
+
+
+class ExportTarget:
+
+    def __init__(self, spec: Dict[str, Any], pool: _ConnectionPool, timeout: float):
+        self.type = spec.get("type")
+        if self.type not in TARGET_TYPES:
+            raise ValueError(f"Invalid export target type: '{self.type}'. Valid types: {', '.join(TARGET_TYPES)}")
+
+        self.spec = spec
+        self.name = spec.get("name") or f"{self.type}:{spec.get('url') or spec.get('path') or spec.get('command')}"
+        self._pool = pool
+        self._timeout = timeout
+
+    def deliver(self, path: str) -> None:
+        if not os.path.exists(path):
+            raise DeliveryError(f"File no longer exists: {path}", retry=False)
+
+        if self.type == "http":
+            self._deliver_http(path)
+        elif self.type == "command":
+            self._deliver_command(path)
+        else:
+            self._deliver_directory(path)
+
+    def _deliver_http(self, path: str) -> None:
+        u = urlsplit(self.spec["url"])
+        scheme = u.scheme or "http"
+        port = u.port or (443 if scheme == "https" else 80)
+        target = u.path or "/"
+        if u.query:
+            target += "?" + u.query
+
+        with open(path, "rb") as f:
+            body = f.read()
+
+        headers = {
+            "Content-Type": "image/png" if path.endswith(".png") else "application/octet-stream",
+            "Content-Length": str(len(body)),
+            "X-Filename": os.path.basename(path),
+            "Connection": "keep-alive",
+        }
+        headers.update(self.spec.get("headers", {}))
+
+        # A pooled connection may have been closed by the server while idle.
+        # Only that case is retried straight away: the upload isn't
+        # idempotent, so a timeout or a failure on a fresh connection goes
+        # through the normal backoff instead of being sent twice.
+        while True:
+            conn, reused = self._pool.acquire(scheme, u.hostname, port)
+            resp = None
+            try:
+                conn.request(self.spec.get("method", "POST"), target, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                if reused and resp is None and isinstance(
+                        e, (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)):
+                    continue
+                raise DeliveryError(f"HTTP delivery failed: {e}")
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self._pool.release(scheme, u.hostname, port, conn)
+
+            if 200 <= resp.status < 300:
+                return
+            retry = resp.status >= 500 or resp.status in (408, 429)
+            raise DeliveryError(f"HTTP {resp.status} {resp.reason}", retry=retry)
+
+    def _deliver_command(self, path: str) -> None:
+        cmd = self.spec["command"]
+        if isinstance(cmd, str):
+            # The path goes through the shell, so it must be quoted: spaces
+            # or metacharacters in the screenshot directory would otherwise
+            # split or inject into the command.
+            quoted = subprocess.list2cmdline([path]) if sys.platform == "win32" else shlex.quote(path)
+            args = cmd.replace("{path}", quoted)
+            shell = True
+        else:
+            args = [a.replace("{path}", path) for a in cmd]
+            shell = False
+
+        try:
+            r = subprocess.run(args, shell=shell, timeout=self._timeout,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise DeliveryError(f"Command failed: {e}")
+
+        if r.returncode != 0:
+            err = r.stderr.decode("utf-8", "replace").strip()[:200]
+            raise DeliveryError(f"Command exited with {r.returncode}: {err}")
+
+    def _deliver_directory(self, path: str) -> None:
+        d = Path(self.spec["path"]).expanduser()
+        dst = d / os.path.basename(path)
+        tmp = d / f".{dst.name}.{os.getpid()}.tmp"
+        try:
+            d.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, dst)
+        except OSError as e:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise DeliveryError(f"Directory sync failed: {e}")
+
+
+class ExportQueue:
+
+    def __init__(self, db_path: str, targets: List[Dict[str, Any]], concurrency: int = 2,
+                 max_attempts: int = 8, backoff_base: float = 1.0, backoff_max: float = 300.0,
+                 timeout: float = 30.0, dead_retention: float = 7 * 86400):
+        self.db_path = db_path
+        self.dead_retention = dead_retention
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._pool = _ConnectionPool(timeout, max_idle=self.concurrency)
+        self.targets: Dict[str, ExportTarget] = {}
+        for spec in targets:
+            t = ExportTarget(spec, self._pool, timeout)
+            self.targets[t.name] = t
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS deliveries ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " target TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_at REAL NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'pending',"
+            " last_error TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS deliveries_due ON deliveries (status, next_at)")
+
+        self._cond = threading.Condition()
+        self._in_flight = set()
+        self._threads: List[threading.Thread] = []
+        self._running = False
+        self._delivered = 0
+        self._failed_attempts = 0
+        self._closed = False
+
+    def enqueue(self, path: str) -> None:
+        if not self.targets:
+            return
+        now = time.time()
+        with self._cond:
+            if self._closed:
+                logger.warning(f"Export queue is stopped, not exporting {path}")
+                return
+            self._db.executemany(
+                "INSERT INTO deliveries (target, path, next_at) VALUES (?, ?, ?)",
+                [(name, path, now) for name in self.targets],
+            )
+            self._cond.notify_all()
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running or not self.targets:
+                return
+            self._running = True
+            self._purge_dead()
+
+        for i in range(self.concurrency):
+            t = threading.Thread(target=self._worker, name=f"swip-export-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._running = False
+            self._cond.notify_all()
+
+        for t in self._threads:
+            t.join(timeout)
+        alive = any(t.is_alive() for t in self._threads)
+        self._threads = []
+        self._pool.close()
+
+        # A worker stuck past the timeout still owns a claimed row; leave
+        # the connection to it rather than closing it underneath.
+        if not alive:
+            with self._cond:
+                self._closed = True
+                self._db.close()
+
+    def _purge_dead(self) -> None:
+        # Called with self._cond held. Dead rows stay around for stats and
+        # inspection, but only for dead_retention seconds.
+        if self.dead_retention is None:
+            return
+        self._db.execute(
+            "DELETE FROM deliveries WHERE status = 'dead' AND next_at < ?",
+            (time.time() - self.dead_retention,),
+        )
+
+    def _claim(self) -> Optional[Tuple[int, str, str, int]]:
+        # Called with self._cond held.
+        now = time.time()
+        q = "SELECT id, target, path, attempts FROM deliveries WHERE status = 'pending' AND next_at <= ?"
+        args: List[Any] = [now]
+        if self._in_flight:
+            q += f" AND id NOT IN ({','.join('?' * len(self._in_flight))})"
+            args.extend(self._in_flight)
+        row = self._db.execute(q + " ORDER BY next_at LIMIT 1", args).fetchone()
+        if row is not None:
+            self._in_flight.add(row[0])
+        return row
+
+    def _next_due(self) -> Optional[float]:
+        # Called with self._cond held. Rows already claimed by another
+        # worker aren't due for this one; counting them made idle workers
+        # re-poll every few ms for as long as a slow delivery ran.
+        q = "SELECT MIN(next_at) FROM deliveries WHERE status = 'pending'"
+        args: List[Any] = []
+        if self._in_flight:
+            q += f" AND id NOT IN ({','.join('?' * len(self._in_flight))})"
+            args.extend(self._in_flight)
+        row = self._db.execute(q, args).fetchone()
+        return row[0] if row else None
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                row = None
+                while self._running:
+                    row = self._claim()
+                    if row is not None:
+                        break
+                    nd = self._next_due()
+                    wait = None if nd is None else max(0.0, nd - time.time())
+                    self._cond.wait(wait)
+                if row is None:
+                    return
+
+            rid, name, path, attempts = row
+            err = None
+            retry = False
+            t = self.targets.get(name)
+            if t is None:
+                err = "Target no longer configured"
+            else:
+                try:
+                    t.deliver(path)
+                except DeliveryError as e:
+                    err, retry = str(e), e.retry
+                except Exception as e:
+                    err, retry = f"Unexpected error: {e}", True
+
+            with self._cond:
+                self._in_flight.discard(rid)
+                if err is None:
+                    self._delivered += 1
+                    self._db.execute("DELETE FROM deliveries WHERE id = ?", (rid,))
+                    continue
+
+                self._failed_attempts += 1
+                attempts += 1
+                if retry and attempts < self.max_attempts:
+                    delay = min(self.backoff_max, self.backoff_base * (2 ** (attempts - 1)))
+                    delay *= random.uniform(0.8, 1.2)
+                    self._db.execute(
+                        "UPDATE deliveries SET attempts = ?, next_at = ?, last_error = ? WHERE id = ?",
+                        (attempts, time.time() + delay, err, rid),
+                    )
+                    logger.warning(f"Export to {name} failed ({err}), retrying in {delay:.1f}s")
+                else:
+                    self._db.execute(
+                        "UPDATE deliveries SET attempts = ?, status = 'dead', next_at = ?,"
+                        " last_error = ? WHERE id = ?",
+                        (attempts, time.time(), err, rid),
+                    )
+                    self._purge_dead()
+                    logger.error(f"Export of {path} to {name} abandoned: {err}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            counts = dict(self._db.execute(
+                "SELECT status, COUNT(*) FROM deliveries GROUP BY status"
+            ).fetchall())
+            return {
+                "targets": list(self.targets),
+                "pending": counts.get("pending", 0),
+                "dead": counts.get("dead", 0),
+                "in_flight": len(self._in_flight),
+                "delivered": self._delivered,
+                "failed_attempts": self._failed_attempts,
+            }
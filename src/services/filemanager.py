@@ -1,13 +1,31 @@
 import os
 import re
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Iterator, Optional, Tuple
 from PIL import Image
 
+from src.services.atomicwrite import AtomicWriter, parse_temp_name, pid_alive
+from src.services.colorreduce import reduce_colors
+from src.services.pngstream import write_png
+
+
+FORMAT_EXTENSIONS = {
+    'PNG': 'png',
+    'JPEG': 'jpg',
+    'WEBP': 'webp',
+    'BMP': 'bmp',
+}
+
+_EXTENSIONS = frozenset(FORMAT_EXTENSIONS.values())
+
 
 class FileManager:
 
-    def __init__(self, screenshot_directory: Optional[str] = None):
+    def __init__(self, screenshot_directory: Optional[str] = None,
+                 stream_threshold: Optional[int] = 16_000_000, band_rows: int = 256,
+                 reduce_palette: bool = True, writer: Optional[AtomicWriter] = None):
         if screenshot_directory is None:
             screenshot_directory = str(Path.home() / "Pictures" / "Screenshots")
         
@@ -15,10 +33,56 @@ class FileManager:
         self._next_number: Optional[int] = None
         self.num = None
         self.last_file = None
+        self._lock = threading.Lock()
+        self.stream_threshold = stream_threshold
+        self.band_rows = band_rows
+        self.reduce_palette = reduce_palette
+        self.writer = writer or AtomicWriter()
+        self._cleaned = False
+
+    @classmethod
+    def from_config(cls, config, screenshot_directory: Optional[str] = None) -> "FileManager":
+        ps = config.get_png_streaming_settings()
+        thr = ps["threshold_megapixels"]
+        return cls(
+            screenshot_directory or config.get_screenshot_directory(),
+            stream_threshold=int(thr * 1_000_000) if thr is not None else None,
+            band_rows=ps["band_rows"],
+            reduce_palette=config.get_png_palette_reduction(),
+            writer=AtomicWriter(**config.get_durability_settings()),
+        )
 
     def ensure_directory_exists(self) -> None:
         self.screenshot_directory.mkdir(parents=True, exist_ok=True)
         self.last_file = self.screenshot_directory
+        
+        if not self._cleaned:
+            self._cleaned = True
+            self.cleanup_temp_files()
+
+    def cleanup_temp_files(self) -> int:
+        n = 0
+        try:
+            for fn in os.listdir(self.screenshot_directory):
+                # Only our own temp names, and only those whose writer is
+                # gone: the daemon, swip-headless and the recompressor can
+                # share this directory and their live temp files must stay.
+                parsed = parse_temp_name(fn)
+                if parsed is None:
+                    continue
+                target, pid = parsed
+                if target.rsplit('.', 1)[-1].lower() not in _EXTENSIONS:
+                    continue
+                if pid == os.getpid() or pid_alive(pid):
+                    continue
+                try:
+                    os.unlink(self.screenshot_directory / fn)
+                    n += 1
+                except OSError:
+                    pass
+        except OSError:
+            pass
+        return n
 
     def get_next_number(self) -> int:
         if self._next_number is not None:
@@ -29,7 +93,7 @@ class FileManager:
             self.num = 1
             return self._next_number
         
-        patt = re.compile(r'^picture-(\d+)\.png$')
+        patt = re.compile(r'^picture-(\d+)\.(?:png|jpg|webp|bmp)$')
         mx = 0
         
         try:
@@ -46,21 +110,55 @@ class FileManager:
         self.num = self._next_number
         return self._next_number
 
-    def get_next_filename(self) -> str:
-        number = self.get_next_number()
-        fname = f"picture-{number}.png"
-        self._next_number = number + 1
+    def get_next_filename(self, extension: str = 'png') -> str:
+        with self._lock:
+            number = self.get_next_number()
+            fname = f"picture-{number}.{extension}"
+            self._next_number = number + 1
         return fname
 
-    def save_screenshot(self, image: Image.Image, filename: Optional[str] = None) -> str:
+    def save_screenshot(self, image: Image.Image, filename: Optional[str] = None,
+                        image_format: str = 'PNG') -> str:
         self.ensure_directory_exists()
         
+        image_format = image_format.upper()
+        if image_format not in FORMAT_EXTENSIONS:
+            raise ValueError(f"Unsupported image format: {image_format}")
+        
         if filename is None:
-            filename = self.get_next_filename()
+            filename = self.get_next_filename(FORMAT_EXTENSIONS[image_format])
         
         fp = self.screenshot_directory / filename
         
-        image.save(fp, format='PNG')
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        
+        if image_format == 'PNG' and self.reduce_palette:
+            image = reduce_colors(image)
+        
+        with self.writer.open(fp) as f:
+            if (image_format == 'PNG' and self.stream_threshold is not None
+                    and image.width * image.height >= self.stream_threshold):
+                write_png(image, f, band_rows=self.band_rows)
+            else:
+                image.save(f, format=image_format)
         self.last_file = fp
         
         return str(fp)
+
+    @contextmanager
+    def open_stream(self, extension: str = 'png') -> Iterator[Tuple[BinaryIO, str]]:
+        # For encoders that write incrementally; the file only appears under
+        # its final name once the block exits cleanly.
+        self.ensure_directory_exists()
+        fp = self.screenshot_directory / self.get_next_filename(extension)
+        
+        with self.writer.open(fp) as f:
+            yield f, str(fp)
+        self.last_file = fp
+
+    def write_stats(self):
+        return self.writer.stats()
+
+    def close(self) -> None:
+        self.writer.close()
@@ -0,0 +1,167 @@
+import logging
+import os
+import socketserver
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from src.utils.ipc import (
+    IPCError, MAX_MESSAGE_SIZE, decode_message, encode_message, is_instance_running,
+    is_supported
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        while True:
+            try:
+                line = self.rfile.readline(MAX_MESSAGE_SIZE + 1)
+            except OSError:
+                return
+            if not line:
+                return
+
+            # An oversized line was only partly read; the rest would be
+            # parsed as further requests, so answer the error and hang up.
+            oversized = len(line) > MAX_MESSAGE_SIZE and not line.endswith(b"\n")
+            resp = self.server.ipc.dispatch(line)
+            try:
+                self.wfile.write(encode_message(resp))
+                self.wfile.flush()
+            except OSError:
+                return
+            if oversized:
+                return
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class IPCServer:
+
+    def __init__(self, socket_path: str, handlers: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]]):
+        self.socket_path = socket_path
+        self._handlers = dict(handlers)
+        self._server: Optional[_UnixServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._in_flight = 0
+        self._started_at: Optional[float] = None
+
+    def start(self) -> bool:
+        if self._server is not None:
+            return True
+        if not is_supported():
+            logger.warning("IPC disabled: Unix domain sockets are not supported")
+            return False
+
+        d = os.path.dirname(self.socket_path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+
+        if os.path.exists(self.socket_path):
+            # Only a stale socket left by a crashed instance may be removed;
+            # a live one belongs to another running daemon.
+            if is_instance_running(self.socket_path):
+                logger.error(f"IPC socket {self.socket_path} is in use by another instance")
+                return False
+            os.unlink(self.socket_path)
+
+        try:
+            self._server = _UnixServer(self.socket_path, _RequestHandler)
+        except OSError as e:
+            logger.error(f"Failed to bind IPC socket {self.socket_path}: {e}")
+            self._server = None
+            return False
+
+        os.chmod(self.socket_path, 0o600)
+        self._server.ipc = self
+        self._started_at = time.monotonic()
+
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="swip-ipc", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"IPC listening on {self.socket_path}")
+        return True
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        self._thread = None
+
+        try:
+            os.unlink(self.socket_path)
+        except OSError:
+            pass
+
+    def is_running(self) -> bool:
+        return self._server is not None
+
+    def dispatch(self, line: bytes) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        cmd = None
+        try:
+            msg = decode_message(line)
+            cmd = msg.get("cmd")
+            h = self._handlers.get(cmd)
+            if h is None:
+                raise IPCError(f"Unknown command: {cmd}")
+
+            args = msg.get("args") or {}
+            if not isinstance(args, dict):
+                raise IPCError("'args' must be a JSON object")
+
+            with self._lock:
+                self._in_flight += 1
+            try:
+                result = h(args)
+            finally:
+                with self._lock:
+                    self._in_flight -= 1
+
+            resp = {"ok": True}
+            resp.update(result or {})
+        except (IPCError, KeyError, TypeError, ValueError) as e:
+            resp = {"ok": False, "error": str(e)}
+        except Exception as e:
+            logger.error(f"IPC command {cmd} failed: {e}")
+            resp = {"ok": False, "error": str(e)}
+
+        ms = (time.perf_counter() - t0) * 1000.0
+        self._record(cmd if cmd in self._handlers else "invalid", ms, resp["ok"])
+        resp["ms"] = round(ms, 3)
+        return resp
+
+    def _record(self, cmd: str, ms: float, ok: bool) -> None:
+        with self._lock:
+            st = self._stats.setdefault(
+                cmd, {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            st["count"] += 1
+            if not ok:
+                st["errors"] += 1
+            st["total_ms"] += ms
+            st["max_ms"] = max(st["max_ms"], ms)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cmds = {}
+            for c, st in self._stats.items():
+                d = dict(st)
+                d["avg_ms"] = st["total_ms"] / st["count"] if st["count"] else 0.0
+                cmds[c] = d
+            in_flight = self._in_flight
+
+        up = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {"uptime_s": round(up, 3), "in_flight": in_flight, "commands": cmds}
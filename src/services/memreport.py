@@ -0,0 +1,146 @@
+import ctypes
+import ctypes.util
+import gc
+import logging
+import os
+import sys
+import tracemalloc
+from typing import Any, Callable, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+_libc = None
+
+
+def start_tracing(frames: int = 1) -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing() -> None:
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def current_rss() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    if sys.platform == "win32":
+        try:
+            from ctypes import wintypes
+
+            class PMC(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            pmc = PMC()
+            pmc.cb = ctypes.sizeof(PMC)
+            h = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(h, ctypes.byref(pmc), pmc.cb):
+                return pmc.WorkingSetSize
+        except (OSError, AttributeError):
+            pass
+    return None
+
+
+def peak_rss() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere.
+    return r if sys.platform == "darwin" else r * 1024
+
+
+def trim_memory() -> bool:
+    global _libc
+
+    gc.collect()
+    if not sys.platform.startswith("linux"):
+        return False
+
+    if _libc is None:
+        name = ctypes.util.find_library("c")
+        try:
+            _libc = ctypes.CDLL(name) if name else False
+        except OSError:
+            _libc = False
+    if not _libc or not hasattr(_libc, "malloc_trim"):
+        return False
+
+    return bool(_libc.malloc_trim(0))
+
+
+def _component(filename: str) -> str:
+    fn = filename.replace("\\", "/")
+    if "/src/" in fn:
+        rel = fn.rsplit("/src/", 1)[1]
+        return rel[:-3].replace("/", ".") if rel.endswith(".py") else rel
+    for mark, name in (("/PIL/", "pillow"), ("/PyQt6/", "qt"), ("/numpy/", "numpy")):
+        if mark in fn:
+            return name
+    return "other"
+
+
+def memory_report(buffers: Optional[Dict[str, Callable[[], int]]] = None,
+                  top: int = 10) -> Dict[str, Any]:
+    rep: Dict[str, Any] = {
+        "rss_bytes": current_rss(),
+        "peak_rss_bytes": peak_rss(),
+    }
+
+    if buffers:
+        b = {}
+        for name, fn in buffers.items():
+            try:
+                b[name] = int(fn())
+            except Exception as e:
+                logger.warning(f"Memory probe {name} failed: {e}")
+        rep["buffers"] = b
+
+    if tracemalloc.is_tracing():
+        snap = tracemalloc.take_snapshot()
+        comps: Dict[str, int] = {}
+        for st in snap.statistics("filename"):
+            c = _component(st.traceback[0].filename)
+            comps[c] = comps.get(c, 0) + st.size
+        cur, peak = tracemalloc.get_traced_memory()
+        rep["tracemalloc"] = {
+            "current_bytes": cur,
+            "peak_bytes": peak,
+            "components": dict(sorted(comps.items(), key=lambda kv: -kv[1])[:top]),
+        }
+
+    return rep
+
+
+def format_report(rep: Dict[str, Any]) -> str:
+    def mb(v):
+        return "n/a" if v is None else f"{v / (1024 * 1024):.1f} MB"
+
+    lines = [f"RSS: {mb(rep.get('rss_bytes'))} (peak {mb(rep.get('peak_rss_bytes'))})"]
+    for name, v in rep.get("buffers", {}).items():
+        lines.append(f"  {name}: {mb(v)}")
+    tm = rep.get("tracemalloc")
+    if tm:
+        lines.append(f"Python heap: {mb(tm['current_bytes'])} (peak {mb(tm['peak_bytes'])})")
+        for name, v in tm["components"].items():
+            lines.append(f"  {name}: {mb(v)}")
+    return "\n".join(lines)
@@ -0,0 +1,171 @@
+import struct
+import zlib
+from typing import BinaryIO, Optional, Tuple, Union
+from pathlib import Path
+
+from PIL.Image import Image
+
+from src.utils.optional import optional_import
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# mode -> (PNG color type, channels)
+_COLOR_TYPES = {
+    'L': (0, 1),
+    'RGB': (2, 3),
+    'P': (3, 1),
+    'LA': (4, 2),
+    'RGBA': (6, 4),
+}
+
+_IDAT_CHUNK_SIZE = 256 * 1024
+
+
+def _write_chunk(f: BinaryIO, ctype: bytes, data: bytes) -> None:
+    f.write(struct.pack('>I', len(data)))
+    f.write(ctype)
+    f.write(data)
+    f.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(ctype)) & 0xffffffff))
+
+
+def _target_mode(image: Image) -> str:
+    if image.mode in _COLOR_TYPES:
+        return image.mode
+    if image.mode == '1' or image.mode.startswith('I'):
+        return 'L'
+    if 'A' in image.getbands() or 'transparency' in image.info:
+        return 'RGBA'
+    return 'RGB'
+
+
+def _filter_band(raw: bytes, stride: int, prev: bytes, use_up: bool) -> bytes:
+    rows = len(raw) // stride
+
+    np = optional_import('numpy') if use_up else None
+    if np is not None:
+        a = np.frombuffer(raw, dtype=np.uint8).reshape(rows, stride)
+        p = np.empty_like(a)
+        p[0] = np.frombuffer(prev, dtype=np.uint8) if prev else 0
+        p[1:] = a[:-1]
+        out = np.empty((rows, stride + 1), dtype=np.uint8)
+        out[:, 0] = 2
+        np.subtract(a, p, out=out[:, 1:])
+        return out.tobytes()
+
+    return b''.join(
+        b'\x00' + raw[i * stride:(i + 1) * stride] for i in range(rows)
+    )
+
+
+class PngWriter:
+
+    def __init__(self, f: BinaryIO, width: int, mode: str, height: Optional[int] = None,
+                 compress_level: int = 6, palette: Optional[bytes] = None,
+                 transparency: Optional[bytes] = None):
+        if mode not in _COLOR_TYPES:
+            raise ValueError(f"Unsupported PNG mode: {mode}")
+
+        self.f = f
+        self.width = width
+        self.mode = mode
+        self.height = height
+        self.rows = 0
+
+        ctype, channels = _COLOR_TYPES[mode]
+        self._ctype = ctype
+        self._stride = width * channels
+        # Palette images compress best unfiltered; for the rest the Up filter
+        # needs only the previous row, so each band is filtered independently.
+        self._use_up = mode != 'P'
+        self._comp = zlib.compressobj(compress_level)
+        self._pending = bytearray()
+        self._prev = b''
+
+        f.write(PNG_SIGNATURE)
+        # With an unknown height the IHDR is patched in close(), which needs
+        # a seekable file.
+        self._ihdr_pos = f.tell() if height is None else None
+        self._write_ihdr(height or 0)
+
+        if mode == 'P':
+            _write_chunk(f, b'PLTE', palette or b'\x00\x00\x00')
+            if transparency:
+                _write_chunk(f, b'tRNS', transparency)
+
+    def _write_ihdr(self, height: int) -> None:
+        _write_chunk(self.f, b'IHDR', struct.pack(
+            '>IIBBBBB', self.width, height, 8, self._ctype, 0, 0, 0
+        ))
+
+    def write_rows(self, band: Image) -> None:
+        if band.width != self.width:
+            raise ValueError(f"Band width {band.width} does not match {self.width}")
+        if band.mode != self.mode:
+            band = band.convert(self.mode)
+
+        raw = band.tobytes()
+        if not raw:
+            return
+
+        self._pending += self._comp.compress(
+            _filter_band(raw, self._stride, self._prev, self._use_up)
+        )
+        self._prev = raw[-self._stride:]
+        self.rows += len(raw) // self._stride
+
+        while len(self._pending) >= _IDAT_CHUNK_SIZE:
+            _write_chunk(self.f, b'IDAT', bytes(self._pending[:_IDAT_CHUNK_SIZE]))
+            del self._pending[:_IDAT_CHUNK_SIZE]
+
+    def close(self) -> None:
+        self._pending += self._comp.flush()
+        if self._pending:
+            _write_chunk(self.f, b'IDAT', bytes(self._pending))
+        self._pending = bytearray()
+        _write_chunk(self.f, b'IEND', b'')
+
+        if self._ihdr_pos is not None:
+            end = self.f.tell()
+            self.f.seek(self._ihdr_pos)
+            self._write_ihdr(self.rows)
+            self.f.seek(end)
+        elif self.rows != self.height:
+            raise ValueError(f"Wrote {self.rows} rows, expected {self.height}")
+
+
+def _palette_chunks(image: Image) -> Tuple[bytes, Optional[bytes]]:
+    w, h = image.size
+    pal = image.getpalette() or []
+    n = min(256, len(pal) // 3)
+    used = max(image.getextrema()[1] + 1, 1) if w and h else 1
+    n = max(min(n, used), 1)
+    plte = bytes(pal[:n * 3]).ljust(n * 3, b'\x00')
+
+    trns = image.info.get('transparency')
+    if isinstance(trns, bytes):
+        return plte, trns[:n]
+    if isinstance(trns, int) and trns < n:
+        return plte, b'\xff' * trns + b'\x00'
+    return plte, None
+
+
+def write_png(image: Image, fp: Union[str, Path, BinaryIO], band_rows: int = 256,
+              compress_level: int = 6) -> None:
+    if isinstance(fp, (str, Path)):
+        with open(fp, 'wb') as f:
+            write_png(image, f, band_rows, compress_level)
+        return
+
+    mode = _target_mode(image)
+    w, h = image.size
+
+    plte = trns = None
+    if mode == 'P':
+        plte, trns = _palette_chunks(image)
+
+    pw = PngWriter(fp, w, mode, height=h, compress_level=compress_level,
+                   palette=plte, transparency=trns)
+    for y in range(0, h, band_rows):
+        pw.write_rows(image.crop((0, y, w, min(y + band_rows, h))))
+    pw.close()
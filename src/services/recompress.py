@@ -0,0 +1,398 @@
+import ctypes
+import io
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, PngImagePlugin
+
+from src.services.atomicwrite import is_temp_name, temp_path_for
+from src.services.colorreduce import reduce_colors
+
+
+logger = logging.getLogger(__name__)
+
+
+_IDLE_PRIORITY_CLASS = 0x00000040
+
+
+def _lower_priority() -> None:
+    # Pool initializer: the workers should only ever get CPU the desktop
+    # isn't using.
+    if hasattr(os, "sched_setscheduler") and hasattr(os, "SCHED_IDLE"):
+        try:
+            os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+        except OSError:
+            pass
+    if hasattr(os, "nice"):
+        try:
+            os.nice(19)
+        except OSError:
+            pass
+    elif sys.platform == "win32":
+        try:
+            k32 = ctypes.windll.kernel32
+            k32.SetPriorityClass(k32.GetCurrentProcess(), _IDLE_PRIORITY_CLASS)
+        except (OSError, AttributeError):
+            pass
+
+
+def on_battery() -> bool:
+    if sys.platform == "win32":
+        try:
+            class SPS(ctypes.Structure):
+                _fields_ = [
+                    ("ACLineStatus", ctypes.c_ubyte),
+                    ("BatteryFlag", ctypes.c_ubyte),
+                    ("BatteryLifePercent", ctypes.c_ubyte),
+                    ("SystemStatusFlag", ctypes.c_ubyte),
+                    ("BatteryLifeTime", ctypes.c_ulong),
+                    ("BatteryFullLifeTime", ctypes.c_ulong),
+                ]
+
+            sps = SPS()
+            if ctypes.windll.kernel32.GetSystemPowerStatus(ctypes.byref(sps)):
+                return sps.ACLineStatus == 0
+        except (OSError, AttributeError):
+            pass
+        return False
+
+    # Linux: on battery when no mains/USB supply reports online.
+    root = Path("/sys/class/power_supply")
+    try:
+        supplies = list(root.iterdir())
+    except OSError:
+        return False
+
+    seen_battery = False
+    for s in supplies:
+        try:
+            kind = (s / "type").read_text().strip()
+            if kind == "Battery":
+                seen_battery = True
+            elif (s / "online").read_text().strip() == "1":
+                return False
+        except OSError:
+            continue
+    return seen_battery
+
+
+def _same_pixels(a: Image.Image, b: Image.Image) -> bool:
+    if a.size != b.size:
+        return False
+    mode = 'RGBA' if 'A' in a.getbands() or 'transparency' in a.info else 'RGB'
+    if mode == 'RGB' and ('A' in b.getbands() or 'transparency' in b.info):
+        mode = 'RGBA'
+    return a.convert(mode).tobytes() == b.convert(mode).tobytes()
+
+
+def _save_kwargs(src: Image.Image) -> Dict[str, Any]:
+    # Carry over the metadata Pillow understands so only the pixel encoding
+    # changes.
+    kw: Dict[str, Any] = {}
+    for k in ("dpi", "icc_profile", "exif"):
+        if src.info.get(k):
+            kw[k] = src.info[k]
+    text = getattr(src, "text", None)
+    if text:
+        info = PngImagePlugin.PngInfo()
+        for k, v in text.items():
+            info.add_text(k, v)
+        kw["pnginfo"] = info
+    return kw
+
+
+# Runs in a pool worker. Re-encodes one PNG if a lossless candidate is
+# smaller; returns (old_size, new_size), equal when the file was left alone.
+def recompress_file(path: str, compress_level: int = 9,
+                    palette: bool = True) -> Tuple[int, int]:
+    p = Path(path)
+    st = p.stat()
+
+    with Image.open(p) as im:
+        if im.format != 'PNG' or getattr(im, "is_animated", False):
+            return st.st_size, st.st_size
+        im.load()
+        src = im
+        kw = _save_kwargs(im)
+
+    candidates = [src]
+    if palette and src.mode not in ('P', '1', 'L'):
+        reduced = reduce_colors(src)
+        if reduced is not src:
+            candidates.append(reduced)
+
+    best = None
+    for c in candidates:
+        buf = io.BytesIO()
+        c.save(buf, format='PNG', optimize=True, compress_level=compress_level, **kw)
+        if best is None or buf.tell() < best.tell():
+            best = buf
+
+    size = best.tell()
+    if size >= st.st_size:
+        return st.st_size, st.st_size
+
+    best.seek(0)
+    with Image.open(best) as check:
+        check.load()
+        if not _same_pixels(src, check):
+            logger.warning(f"Recompressed {p.name} does not match the original, skipping")
+            return st.st_size, st.st_size
+
+    tmp = temp_path_for(p)
+    try:
+        with open(tmp, "wb") as f:
+            f.write(best.getbuffer())
+            f.flush()
+            os.fsync(f.fileno())
+        # Keep the capture time so ordering by mtime and the checkpoint
+        # signature of untouched files stay meaningful.
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        cur = p.stat()
+        if (cur.st_size, cur.st_mtime_ns) != (st.st_size, st.st_mtime_ns):
+            raise OSError(f"{p.name} changed while it was being recompressed")
+        os.replace(tmp, p)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+    return st.st_size, size
+
+
+# Shrinks old PNGs in the screenshot directory in the background. Progress
+# is checkpointed as name -> (size, mtime) after the last visit, so a restart
+# resumes where it stopped and modified files are looked at again.
+class ArchiveRecompressor:
+
+    def __init__(self, directory: str, checkpoint_path: str,
+                 is_busy: Callable[[], bool] = lambda: False,
+                 workers: int = 1, min_age: float = 3600.0,
+                 compress_level: int = 9, palette: bool = True,
+                 rescan_interval: float = 3600.0, pause_on_battery: bool = True,
+                 poll_interval: float = 5.0):
+        self.directory = Path(directory)
+        self.checkpoint_path = Path(checkpoint_path)
+        self.is_busy = is_busy
+        self.workers = max(1, workers)
+        self.min_age = min_age
+        self.compress_level = compress_level
+        self.palette = palette
+        self.rescan_interval = rescan_interval
+        self.pause_on_battery = pause_on_battery
+        self.poll_interval = poll_interval
+
+        self._done: Dict[str, Tuple[int, int]] = {}
+        self._dirty = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._counters = {
+            "checked": 0,
+            "rewritten": 0,
+            "bytes_saved": 0,
+            "errors": 0,
+        }
+        self._state = "stopped"
+
+    def _load_checkpoint(self) -> None:
+        try:
+            with open(self.checkpoint_path, "r") as f:
+                data = json.load(f)
+            self._done = {k: tuple(v) for k, v in data.get("done", {}).items()}
+        except (OSError, ValueError, AttributeError):
+            self._done = {}
+
+    def _save_checkpoint(self) -> None:
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = temp_path_for(self.checkpoint_path)
+        try:
+            with open(tmp, "w") as f:
+                json.dump({"done": self._done}, f)
+            os.replace(tmp, self.checkpoint_path)
+            self._dirty = 0
+        except OSError as e:
+            logger.warning(f"Could not save recompression checkpoint: {e}")
+
+    def _pending(self):
+        cutoff = time.time() - self.min_age
+        try:
+            entries = sorted(os.scandir(self.directory), key=lambda e: e.name)
+        except OSError:
+            return
+
+        for e in entries:
+            if not e.name.lower().endswith('.png') or is_temp_name(e.name):
+                continue
+            try:
+                st = e.stat()
+            except OSError:
+                continue
+            if st.st_mtime > cutoff:
+                continue
+            if self._done.get(e.name) == (st.st_size, st.st_mtime_ns):
+                continue
+            yield e.name
+
+    def _prune(self) -> None:
+        # Forget files that were deleted or renamed so the checkpoint
+        # doesn't grow with every capture ever taken.
+        try:
+            names = {e.name for e in os.scandir(self.directory)}
+        except OSError:
+            return
+        gone = [n for n in self._done if n not in names]
+        for n in gone:
+            del self._done[n]
+        self._dirty += len(gone)
+
+    def _paused(self) -> Optional[str]:
+        if self.is_busy():
+            return "capture pipeline busy"
+        if self.pause_on_battery and on_battery():
+            return "on battery"
+        return None
+
+    def _wait_until_idle(self) -> bool:
+        while not self._stop.is_set():
+            reason = self._paused()
+            if reason is None:
+                self._state = "running"
+                return True
+            self._state = f"paused ({reason})"
+            self._stop.wait(self.poll_interval)
+        return False
+
+    def _run(self) -> None:
+        self._load_checkpoint()
+
+        while not self._stop.is_set():
+            pending = self._pending()
+            # Files from a batch whose worker died; they're retried one at a
+            # time so only the file that kills a worker is given up on.
+            solo: List[str] = []
+            while self._wait_until_idle():
+                # At most one file per worker in flight, so a capture that
+                # starts now waits behind no more than this batch.
+                if solo:
+                    batch = [solo.pop(0)]
+                else:
+                    batch = [n for _, n in zip(range(self.workers), pending)]
+                if not batch:
+                    self._prune()
+                    break
+                try:
+                    futs = [
+                        (n, self._pool.submit(recompress_file, str(self.directory / n),
+                                              self.compress_level, self.palette))
+                        for n in batch
+                    ]
+                except BrokenProcessPool:
+                    self._restart_pool()
+                    solo.extend(batch)
+                    continue
+
+                broken = False
+                for n, fut in futs:
+                    # Files not started yet are left for the next run.
+                    if self._stop.is_set() and fut.cancel():
+                        continue
+                    if isinstance(fut.exception(), BrokenProcessPool):
+                        broken = True
+                        if len(futs) > 1:
+                            solo.append(n)
+                            continue
+                    self._record(n, fut)
+                if broken:
+                    self._restart_pool()
+
+            if self._dirty:
+                self._save_checkpoint()
+            if self._stop.is_set():
+                break
+            self._state = "idle"
+            self._stop.wait(self.rescan_interval)
+
+        self._state = "stopped"
+
+    def _record(self, name: str, fut) -> None:
+        old = new = 0
+        try:
+            old, new = fut.result()
+        except Exception as e:
+            logger.warning(f"Recompression of {name} failed: {e}")
+            with self._lock:
+                self._counters["errors"] += 1
+
+        try:
+            st = (self.directory / name).stat()
+            self._done[name] = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            self._done.pop(name, None)
+        self._dirty += 1
+
+        with self._lock:
+            self._counters["checked"] += 1
+            if new < old:
+                self._counters["rewritten"] += 1
+                self._counters["bytes_saved"] += old - new
+                logger.info(f"Recompressed {name}: {old} -> {new} bytes")
+
+        if self._dirty >= 32:
+            self._save_checkpoint()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn, not fork: the parent has Qt and worker threads running.
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_lower_priority,
+        )
+
+    def _restart_pool(self) -> None:
+        # A worker killed by the OOM killer or a crash inside Pillow breaks
+        # the whole pool; every later submit would fail until it's replaced.
+        logger.warning("Recompression worker died, restarting the pool")
+        self._pool.shutdown(wait=True)
+        self._pool = self._new_pool()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._pool = self._new_pool()
+        self._thread = threading.Thread(
+            target=self._run, name="swip-recompress", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        # Nothing is left queued once the thread has exited, so there's no
+        # need for cancel_futures (Python 3.9+).
+        self._pool.shutdown(wait=True)
+        self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            st: Dict[str, Any] = dict(self._counters)
+        st["state"] = self._state
+        st["tracked_files"] = len(self._done)
+        return st
@@ -0,0 +1,231 @@
+import logging
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from PyQt6.QtCore import QObject, QTimer, Qt
+
+from src.services.timerwheel import TimerHandle, TimerWheel
+
+
+logger = logging.getLogger(__name__)
+
+
+_CRON_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 6))
+
+
+def _parse_cron_field(field: str, lo: int, hi: int) -> Set[int]:
+    out: Set[int] = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, s = part.split("/", 1)
+            step = int(s)
+            if step < 1:
+                raise ValueError(f"Invalid cron step: {s}")
+        if part == "*":
+            a, b = lo, hi
+        elif "-" in part:
+            a, b = (int(v) for v in part.split("-", 1))
+        else:
+            a = b = int(part)
+        if a < lo or b > hi or a > b:
+            raise ValueError(f"Cron value out of range: {part}")
+        out.update(range(a, b + 1, step))
+    return out
+
+
+class CronSpec:
+
+    def __init__(self, spec: str):
+        fields = spec.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron spec needs 5 fields: '{spec}'")
+        self.spec = spec
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_cron_field(f, lo, hi) for f, (lo, hi) in zip(fields, _CRON_RANGES)
+        )
+        # As in standard cron: when both day-of-month and day-of-week are
+        # restricted a day matches either; a '*' field defers to the other.
+        self._dom_any = fields[2].startswith("*")
+        self._dow_any = fields[4].startswith("*")
+
+    def _day_matches(self, t: datetime) -> bool:
+        dom = t.day in self.days
+        # cron weekday: 0 = Sunday
+        dow = (t.weekday() + 1) % 7 in self.weekdays
+        if self._dom_any or self._dow_any:
+            return dom and dow
+        return dom or dow
+
+    def next_after(self, dt: datetime) -> datetime:
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=4 * 366 + 1)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            if t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+                continue
+            return t
+        raise ValueError(f"Cron spec '{self.spec}' never fires")
+
+
+class ScheduledJob:
+
+    def __init__(self, name: str, target: Dict[str, Any], every: Optional[float] = None,
+                 cron: Optional[str] = None, jitter: float = 0.0, skip_if_busy: bool = True,
+                 count: Optional[int] = None):
+        if (every is None) == (cron is None):
+            raise ValueError(f"Job '{name}' needs exactly one of 'every' or 'cron'")
+        if every is not None and every <= 0:
+            raise ValueError(f"Job '{name}' interval must be positive")
+
+        self.name = name
+        self.target = target
+        self.every = every
+        self.cron = CronSpec(cron) if cron else None
+        self.jitter = max(0.0, jitter)
+        self.skip_if_busy = skip_if_busy
+        self.count = count
+
+        self.base: Optional[float] = None
+        self.handle: Optional[TimerHandle] = None
+        # Set by the runner while this job's capture is still in progress;
+        # a job never overlaps with itself.
+        self.running = False
+        self.fired = 0
+        self.skipped = 0
+        self.missed = 0
+
+    def first_base(self, now: float) -> float:
+        if self.cron is not None:
+            nxt = self.cron.next_after(datetime.now())
+            return now + (nxt - datetime.now()).total_seconds()
+        return now + self.every
+
+    def next_base(self, now: float) -> float:
+        if self.cron is not None:
+            return self.first_base(now)
+
+        # Advance from the previous slot rather than from now so long
+        # timelapses don't drift; periods we slept through count as missed.
+        nb = self.base + self.every
+        if nb <= now:
+            n = int((now - self.base) // self.every)
+            self.missed += max(0, n - 1)
+            nb = self.base + (n + 1) * self.every
+        return nb
+
+    def done(self) -> bool:
+        return self.count is not None and self.fired + self.skipped >= self.count
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "schedule": self.cron.spec if self.cron else f"every {self.every}s",
+            "fired": self.fired,
+            "skipped": self.skipped,
+            "missed": self.missed,
+        }
+
+
+class CaptureScheduler(QObject):
+
+    def __init__(self, run_job: Callable[[ScheduledJob], None],
+                 is_busy: Callable[[], bool] = lambda: False,
+                 tick: float = 0.05, parent=None):
+        super().__init__(parent)
+        self._run_job = run_job
+        self._is_busy = is_busy
+        self._wheel = TimerWheel(time.monotonic(), tick)
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._running = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def add_job(self, job: ScheduledJob) -> None:
+        self.remove_job(job.name)
+        self._jobs[job.name] = job
+        now = time.monotonic()
+        job.base = job.first_base(now)
+        self._arm_job(job)
+        self._rearm()
+
+    def remove_job(self, name: str) -> bool:
+        job = self._jobs.pop(name, None)
+        if job is None:
+            return False
+        if job.handle is not None:
+            self._wheel.cancel(job.handle)
+            job.handle = None
+        self._rearm()
+        return True
+
+    def _arm_job(self, job: ScheduledJob) -> None:
+        at = job.base + (random.uniform(0, job.jitter) if job.jitter else 0.0)
+        job.handle = self._wheel.add(at, job)
+
+    def start(self) -> None:
+        self._running = True
+        self._rearm()
+
+    def stop(self) -> None:
+        self._running = False
+        self._timer.stop()
+
+    def _rearm(self) -> None:
+        if not self._running:
+            return
+        nxt = self._wheel.next_expiry()
+        if nxt is None:
+            self._timer.stop()
+            return
+        # One wakeup for the earliest job, however many jobs are scheduled.
+        # Round up so the wakeup never lands before the due tick, and go
+        # precise for short waits: a coarse timer may fire up to 5% early,
+        # which would otherwise mean a wasted wakeup and a 0 ms re-arm.
+        ms = max(0, math.ceil((nxt - time.monotonic()) * 1000))
+        self._timer.setTimerType(
+            Qt.TimerType.PreciseTimer if ms < 1000 else Qt.TimerType.CoarseTimer
+        )
+        self._timer.start(ms)
+
+    def _on_timeout(self) -> None:
+        now = time.monotonic()
+        for job in self._wheel.advance(now):
+            job.handle = None
+            if job.name not in self._jobs:
+                continue
+
+            if job.running or (job.skip_if_busy and self._is_busy()):
+                job.skipped += 1
+            else:
+                job.fired += 1
+                try:
+                    self._run_job(job)
+                except Exception as e:
+                    logger.error(f"Scheduled job {job.name} failed: {e}")
+
+            if job.done():
+                del self._jobs[job.name]
+                continue
+
+            job.base = job.next_base(time.monotonic())
+            self._arm_job(job)
+
+        self._rearm()
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: j.stats() for name, j in self._jobs.items()}
@@ -1,16 +1,37 @@
 from PIL import ImageGrab
 from PIL.Image import Image
-from typing import Tuple
+from typing import List, Tuple
 
 
 class ScreenshotCapture:
-    
+
+    def __init__(self):
+        self._monitors: List[Tuple[int, int, int, int]] = []
+
+    def set_monitors(self, monitors: List[Tuple[int, int, int, int]]) -> None:
+        self._monitors = [tuple(m) for m in monitors]
+
+    def get_monitors(self) -> List[Tuple[int, int, int, int]]:
+        return list(self._monitors)
+
     def capture_region(self, x: int, y: int, width: int, height: int) -> Image:
         bbox = (x, y, x + width, y + height)
         return ImageGrab.grab(bbox=bbox)
     
     def capture_fullscreen(self) -> Image:
         return ImageGrab.grab()
+
+    def capture_monitor(self, index: int) -> Image:
+        if not self._monitors:
+            if index != 0:
+                raise ValueError(f"Monitor {index} not available")
+            return self.capture_fullscreen()
+
+        if index < 0 or index >= len(self._monitors):
+            raise ValueError(f"Monitor {index} not available ({len(self._monitors)} detected)")
+
+        x, y, w, h = self._monitors[index]
+        return self.capture_region(x, y, w, h)
     
     def get_screen_geometry(self) -> Tuple[int, int]:
         img = ImageGrab.grab()
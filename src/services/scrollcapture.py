@@ -0,0 +1,168 @@
+import threading
+from typing import BinaryIO, Dict, List, Optional
+
+from PIL.Image import Image
+
+from src.services.pngstream import PngWriter
+
+
+_MAX_ANCHORS = 16
+_MAX_CANDIDATES = 8
+
+
+def row_hashes(image: Image) -> List[int]:
+    raw = image.tobytes()
+    stride = len(raw) // image.height if image.height else 0
+    if not stride:
+        return []
+
+    # bytes hashing runs in C, so one pass over the rows is already linear
+    # and cheaper than the tobytes() copy it follows.
+    return [hash(raw[i:i + stride]) for i in range(0, len(raw), stride)]
+
+
+def find_offset(prev: List[int], cur: List[int], top: int = 0, bottom: int = 0,
+                min_overlap: int = 16) -> Optional[int]:
+    # Rows `cur` has scrolled past `prev`, or None. Only rows in
+    # [top, len - bottom) are compared so fixed headers and footers don't
+    # pin the match to zero.
+    end = len(cur) - bottom
+    if len(prev) != len(cur) or end - top < min_overlap:
+        return None
+
+    if prev[top:end] == cur[top:end]:
+        return 0
+
+    counts: Dict[int, int] = {}
+    for h in cur[top:end]:
+        counts[h] = counts.get(h, 0) + 1
+
+    where: Dict[int, List[int]] = {}
+    for i in range(top, end):
+        where.setdefault(prev[i], []).append(i)
+
+    # Anchor on the first rows that are unique in the new frame; flat
+    # backgrounds repeat and would produce a candidate per row.
+    tried = 0
+    for i in range(top, end - min_overlap + 1):
+        h = cur[i]
+        if counts[h] != 1:
+            continue
+        for p in where.get(h, ())[:_MAX_CANDIDATES]:
+            d = p - i
+            if d <= 0 or end - top - d < min_overlap:
+                continue
+            if prev[top + d:end] == cur[top:end - d]:
+                return d
+        tried += 1
+        if tried >= _MAX_ANCHORS:
+            break
+    return None
+
+
+# Stitches successive frames of a scrolling region into one PNG. Only the
+# previous frame and its row hashes are kept; new rows go straight to the
+# encoder, so memory doesn't grow with page length.
+class ScrollCapture:
+
+    def __init__(self, f: BinaryIO, ignore_top: int = 0, ignore_bottom: int = 0,
+                 max_height: Optional[int] = None, min_overlap: int = 16,
+                 compress_level: int = 6):
+        self.f = f
+        self.ignore_top = max(0, ignore_top)
+        self.ignore_bottom = max(0, ignore_bottom)
+        self.max_height = max_height
+        self.min_overlap = min_overlap
+        self.compress_level = compress_level
+
+        self.frames = 0
+        self.unchanged = 0
+        self.mismatches = 0
+        self.finished = False
+
+        self._writer: Optional[PngWriter] = None
+        self._last: Optional[Image] = None
+        self._hashes: List[int] = []
+        self._lock = threading.Lock()
+
+    @property
+    def height(self) -> int:
+        if self._writer is None:
+            return 0
+        if self.finished:
+            return self._writer.rows
+        return self._writer.rows + self.ignore_bottom
+
+    def add_frame(self, frame: Image) -> int:
+        # Returns the number of new rows appended.
+        with self._lock:
+            if self.finished:
+                raise RuntimeError("Scroll capture already finished")
+
+            mode = 'RGBA' if 'A' in frame.getbands() else 'RGB'
+            if frame.mode != mode:
+                frame = frame.convert(mode)
+
+            w, h = frame.size
+            end = h - self.ignore_bottom
+            hashes = row_hashes(frame)
+            self.frames += 1
+
+            if self._writer is None:
+                if end - self.ignore_top < self.min_overlap:
+                    raise ValueError("Scroll region is too small after ignoring header and footer")
+                self._writer = PngWriter(self.f, w, mode, compress_level=self.compress_level)
+                self._writer.write_rows(frame.crop((0, 0, w, end)))
+                self._last, self._hashes = frame, hashes
+                return end
+
+            if (w, h) != self._last.size:
+                raise ValueError("Scroll frames must all be the same size")
+
+            d = find_offset(self._hashes, hashes, self.ignore_top,
+                            self.ignore_bottom, self.min_overlap)
+            if d is None:
+                # Scrolled further than one frame or the content changed in
+                # place; skip it and try the next grab against the same base.
+                self.mismatches += 1
+                return 0
+            if d == 0:
+                self.unchanged += 1
+                return 0
+
+            n = d
+            if self.max_height is not None:
+                n = min(d, max(0, self.max_height - self.height))
+            if n:
+                self._writer.write_rows(frame.crop((0, end - d, w, end - d + n)))
+            self.unchanged = 0
+            self._last, self._hashes = frame, hashes
+            return n
+
+    def at_limit(self) -> bool:
+        return self.max_height is not None and self.height >= self.max_height
+
+    def finish(self) -> int:
+        # Writes the footer and closes the PNG; returns the final height.
+        with self._lock:
+            if self.finished:
+                return self.height
+            if self._writer is None:
+                raise ValueError("Scroll capture has no frames")
+            self.finished = True
+
+            w, h = self._last.size
+            if self.ignore_bottom:
+                self._writer.write_rows(self._last.crop((0, h - self.ignore_bottom, w, h)))
+            self._writer.close()
+            height = self._writer.rows
+            self._last, self._hashes = None, []
+            return height
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "frames": self.frames,
+            "height": self.height,
+            "unchanged": self.unchanged,
+            "mismatches": self.mismatches,
+        }
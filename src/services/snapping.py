@@ -0,0 +1,127 @@
+import bisect
+import logging
+import sys
+from typing import List, Sequence, Tuple
+
+from PIL import Image, ImageChops
+
+
+logger = logging.getLogger(__name__)
+
+
+Rect = Tuple[int, int, int, int]
+
+
+class SnapIndex:
+
+    def __init__(self, xs: Sequence[int], ys: Sequence[int], windows: Sequence[Rect] = ()):
+        self.xs: List[int] = sorted(set(xs))
+        self.ys: List[int] = sorted(set(ys))
+        self.windows: List[Rect] = list(windows)
+
+    def __len__(self) -> int:
+        return len(self.xs) + len(self.ys)
+
+    @staticmethod
+    def _nearest(arr: List[int], v: int, tol: int) -> int:
+        i = bisect.bisect_left(arr, v)
+        best = v
+        bd = tol + 1
+        if i < len(arr) and arr[i] - v < bd:
+            best, bd = arr[i], arr[i] - v
+        if i > 0 and v - arr[i - 1] < bd:
+            best = arr[i - 1]
+        return best
+
+    def snap(self, x: int, y: int, tol: int = 8) -> Tuple[int, int]:
+        return self._nearest(self.xs, x, tol), self._nearest(self.ys, y, tol)
+
+
+def _edge_profile(gray: Image.Image, dx: int, dy: int, threshold: int, size: Tuple[int, int]) -> List[int]:
+    diff = ImageChops.difference(gray, ImageChops.offset(gray, dx, dy))
+    mask = diff.point(lambda v: 255 if v >= threshold else 0)
+    # BOX-resizing the binary mask to a single row/column gives, per
+    # column/row, the fraction of pixels sitting on a strong gradient.
+    return list(mask.resize(size, Image.Resampling.BOX).getdata())
+
+
+def _peaks(prof: List[int], min_value: int, limit: int) -> List[int]:
+    n = len(prof)
+    out = []
+    for i in range(1, n):
+        v = prof[i]
+        if v < min_value:
+            continue
+        if v < prof[i - 1] or (i + 1 < n and v < prof[i + 1]):
+            continue
+        out.append((v, i))
+    out.sort(reverse=True)
+    return [i for _, i in out[:limit]]
+
+
+def find_edges(gray: Image.Image, threshold: int = 24, min_fraction: float = 0.04,
+               limit: int = 512) -> Tuple[List[int], List[int]]:
+    if gray.mode != 'L':
+        gray = gray.convert('L')
+
+    w, h = gray.size
+    if w < 2 or h < 2:
+        return [0, w], [0, h]
+
+    mv = max(1, int(min_fraction * 255))
+    xs = _peaks(_edge_profile(gray, 1, 0, threshold, (w, 1)), mv, limit)
+    ys = _peaks(_edge_profile(gray, 0, 1, threshold, (1, h)), mv, limit)
+
+    return [0, w] + xs, [0, h] + ys
+
+
+def list_window_rects() -> List[Rect]:
+    if sys.platform != "win32":
+        return []
+
+    try:
+        import ctypes
+        from ctypes import wintypes
+    except ImportError:
+        return []
+
+    user32 = ctypes.windll.user32
+    rects: List[Rect] = []
+
+    def cb(hwnd, _):
+        if not user32.IsWindowVisible(hwnd) or user32.IsIconic(hwnd):
+            return True
+        r = wintypes.RECT()
+        if user32.GetWindowRect(hwnd, ctypes.byref(r)):
+            w, h = r.right - r.left, r.bottom - r.top
+            if w > 1 and h > 1:
+                rects.append((r.left, r.top, w, h))
+        return True
+
+    proc = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)(cb)
+    try:
+        user32.EnumWindows(proc, 0)
+    except OSError as e:
+        logger.warning(f"Window enumeration failed: {e}")
+    return rects
+
+
+def build_snap_index(gray: Image.Image, origin: Tuple[int, int] = (0, 0),
+                     scale: float = 1.0) -> SnapIndex:
+    xs, ys = find_edges(gray)
+    xs = [int(round(x / scale)) for x in xs]
+    ys = [int(round(y / scale)) for y in ys]
+
+    ox, oy = origin
+    lw, lh = int(gray.width / scale), int(gray.height / scale)
+    wins = []
+    for x, y, w, h in list_window_rects():
+        x, y = int((x - ox) / scale), int((y - oy) / scale)
+        w, h = int(w / scale), int(h / scale)
+        if x + w <= 0 or y + h <= 0 or x >= lw or y >= lh:
+            continue
+        wins.append((x, y, w, h))
+        xs.extend((x, x + w))
+        ys.extend((y, y + h))
+
+    return SnapIndex(xs, ys, wins)
@@ -0,0 +1,214 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QTimer, Qt
+
+
+logger = logging.getLogger(__name__)
+
+
+MAX_STACK_DEPTH = 32
+MAX_SAMPLES = 200
+
+Frame = Tuple[str, int, str]
+
+
+def _sample_stack(frame) -> Tuple[Frame, ...]:
+    out: List[Frame] = []
+    while frame is not None and len(out) < MAX_STACK_DEPTH:
+        co = frame.f_code
+        out.append((co.co_filename, frame.f_lineno, co.co_name))
+        frame = frame.f_back
+    out.reverse()
+    return tuple(out)
+
+
+class StallReport:
+
+    def __init__(self, started: float, duration_ms: float, stage: Optional[str],
+                 stacks: "Counter[Tuple[Frame, ...]]"):
+        self.started = started
+        self.duration_ms = duration_ms
+        self.stage = stage
+        self.stacks = stacks
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def as_dict(self, max_stacks: int = 5) -> Dict[str, Any]:
+        return {
+            "started": self.started,
+            "duration_ms": round(self.duration_ms, 1),
+            "stage": self.stage,
+            "samples": self.samples,
+            "stacks": [
+                {"count": n, "frames": [list(f) for f in st]}
+                for st, n in self.stacks.most_common(max_stacks)
+            ],
+        }
+
+
+# A heartbeat timer on the GUI thread stamps when it last ran; a monitor
+# thread samples the GUI stack while it's overdue, and the next beat files
+# a report with the samples and the active stage.
+class StallWatchdog(QObject):
+
+    def __init__(self, threshold_ms: float = 100.0, interval_ms: int = 50,
+                 sample_interval_ms: float = 10.0, max_reports: int = 100, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000.0
+        self.interval = interval_ms / 1000.0
+        self.sample_interval = sample_interval_ms / 1000.0
+
+        self.reports: Deque[StallReport] = deque(maxlen=max_reports)
+        self._gui_ident = threading.get_ident()
+        self._stages: Tuple[str, ...] = ()
+        self._last_beat = time.monotonic()
+        self._stall_count = 0
+        self._worst_ms = 0.0
+
+        self._lock = threading.Lock()
+        self._samples: "Counter[Tuple[Frame, ...]]" = Counter()
+        self._sample_stage: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._timer = QTimer(self)
+        # Coarse is plenty for a 100 ms threshold and lets the OS batch the
+        # wakeups.
+        self._timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self._timer.timeout.connect(self._beat)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        # Only the GUI thread is watched, so stages entered elsewhere are
+        # ignored. Rebinding a tuple keeps the monitor thread's reads
+        # consistent.
+        if threading.get_ident() != self._gui_ident:
+            yield
+            return
+        prev = self._stages
+        self._stages = prev + (name,)
+        try:
+            yield
+        finally:
+            self._stages = prev
+
+    @property
+    def current_stage(self) -> Optional[str]:
+        stages = self._stages
+        return stages[-1] if stages else None
+
+    def _beat(self) -> None:
+        now = time.monotonic()
+        late = now - self._last_beat - self.interval
+        self._last_beat = now
+
+        with self._lock:
+            samples, self._samples = self._samples, Counter()
+            stage = self._sample_stage
+            self._sample_stage = None
+
+        if late < self.threshold:
+            return
+
+        rep = StallReport(
+            time.time() - late - self.interval, late * 1000.0,
+            stage or self.current_stage, samples,
+        )
+        self.reports.append(rep)
+        self._stall_count += 1
+        self._worst_ms = max(self._worst_ms, rep.duration_ms)
+        logger.warning(
+            f"Event loop stalled for {rep.duration_ms:.0f} ms"
+            f" (stage: {rep.stage or 'idle'}, {rep.samples} samples)"
+        )
+
+    def _monitor(self) -> None:
+        # Sleep until the heartbeat would be over threshold; only sample at
+        # sample_interval while it actually is.
+        while not self._stop.is_set():
+            due = self._last_beat + self.interval + self.threshold
+            wait = due - time.monotonic()
+            if wait > 0:
+                self._stop.wait(wait)
+                continue
+
+            frame = sys._current_frames().get(self._gui_ident)
+            if frame is not None:
+                st = _sample_stack(frame)
+                del frame
+                with self._lock:
+                    if sum(self._samples.values()) < MAX_SAMPLES:
+                        self._samples[st] += 1
+                    if self._sample_stage is None:
+                        self._sample_stage = self.current_stage
+            self._stop.wait(self.sample_interval)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._last_beat = time.monotonic()
+        self._timer.start(max(1, int(self.interval * 1000)))
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._monitor, name="swip-stallwatch", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._timer.stop()
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "stalls": self._stall_count,
+            "worst_ms": round(self._worst_ms, 1),
+            "threshold_ms": self.threshold * 1000.0,
+            "kept_reports": len(self.reports),
+        }
+
+    def report_dicts(self, limit: Optional[int] = None,
+                     max_stacks: int = 5) -> List[Dict[str, Any]]:
+        reports = list(self.reports)
+        if limit is not None:
+            reports = reports[-limit:] if limit > 0 else []
+        return [r.as_dict(max_stacks) for r in reports]
+
+    def export(self, path: str) -> str:
+        data = {"stats": self.stats(), "reports": self.report_dicts()}
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+        return path
+
+
+def format_reports(reports: List[Dict[str, Any]], limit: int = 10) -> str:
+    if not reports:
+        return "No event loop stalls recorded"
+
+    lines = []
+    for r in reports[-limit:]:
+        ts = time.strftime("%H:%M:%S", time.localtime(r["started"]))
+        lines.append(
+            f"{ts}  {r['duration_ms']:.0f} ms  stage: {r['stage'] or 'idle'}"
+            f"  ({r['samples']} samples)"
+        )
+        if r["stacks"]:
+            top = r["stacks"][0]["frames"]
+            for fn, ln, name in top[-5:]:
+                lines.append(f"    {os.path.basename(fn)}:{ln} in {name}")
+    return "\n".join(lines)
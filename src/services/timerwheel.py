@@ -0,0 +1,90 @@
+from typing import Any, List, Optional
+
+
+def _ms(t: float) -> int:
+    # Ticks are computed in integer milliseconds: dividing monotonic times
+    # around 1e7 s by the tick in floats lands a fifth of them in the wrong
+    # slot, and next_expiry() must map back to exactly the tick it came from.
+    return int(round(t * 1000.0))
+
+
+class TimerHandle:
+
+    __slots__ = ("tick", "item", "cancelled")
+
+    def __init__(self, tick: int, item: Any):
+        self.tick = tick
+        self.item = item
+        self.cancelled = False
+
+
+class TimerWheel:
+
+    def __init__(self, now: float, tick: float = 0.05, slots: int = 512):
+        self.tick = tick
+        self._tick_ms = max(1, _ms(tick))
+        self.slots = slots
+        self._wheel: List[List[TimerHandle]] = [[] for _ in range(slots)]
+        self._cur = self._tick_of(now)
+        self._count = 0
+
+    def _tick_of(self, now: float) -> int:
+        return _ms(now) // self._tick_ms
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, deadline: float, item: Any) -> TimerHandle:
+        t = max(-(-_ms(deadline) // self._tick_ms), self._cur + 1)
+        h = TimerHandle(t, item)
+        self._wheel[t % self.slots].append(h)
+        self._count += 1
+        return h
+
+    def cancel(self, handle: TimerHandle) -> None:
+        if not handle.cancelled:
+            handle.cancelled = True
+            self._count -= 1
+
+    def advance(self, now: float) -> List[Any]:
+        target = self._tick_of(now)
+        if target <= self._cur:
+            return []
+
+        fired = []
+        # Past one full rotation every slot has to be visited anyway.
+        n = min(target - self._cur, self.slots)
+        for i in range(1, n + 1):
+            slot = self._wheel[(self._cur + i) % self.slots]
+            if not slot:
+                continue
+            keep = []
+            for h in slot:
+                if h.cancelled:
+                    continue
+                if h.tick <= target:
+                    self._count -= 1
+                    h.cancelled = True
+                    fired.append(h.item)
+                else:
+                    keep.append(h)
+            slot[:] = keep
+
+        self._cur = target
+        return fired
+
+    def next_expiry(self) -> Optional[float]:
+        if self._count <= 0:
+            return None
+
+        best = None
+        for i in range(1, self.slots + 1):
+            t = self._cur + i
+            for h in self._wheel[t % self.slots]:
+                if h.cancelled:
+                    continue
+                if h.tick == t:
+                    return t * self._tick_ms / 1000.0
+                if best is None or h.tick < best:
+                    best = h.tick
+        return best * self._tick_ms / 1000.0 if best is not None else None
@@ -0,0 +1,174 @@
+import heapq
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageChops
+
+
+logger = logging.getLogger(__name__)
+
+
+class Watch:
+
+    def __init__(self, name: str, region: Sequence[int], min_interval: float = 0.5,
+                 max_interval: float = 30.0, backoff: float = 2.0, threshold: float = 0.01,
+                 pixel_threshold: int = 16, cooldown: float = 1.0):
+        x, y, w, h = (int(v) for v in region)
+        if w <= 0 or h <= 0:
+            raise ValueError(f"Invalid watch region: {region!r}")
+        if min_interval <= 0 or max_interval < min_interval or backoff < 1:
+            raise ValueError("Watch intervals must satisfy 0 < min_interval <= max_interval and backoff >= 1")
+
+        self.name = name
+        self.region = (x, y, w, h)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.threshold = threshold
+        self.pixel_threshold = pixel_threshold
+        self.cooldown = cooldown
+
+        self.interval = min_interval
+        self.signature: Optional[Image.Image] = None
+        self.last_capture = 0.0
+        self.polls = 0
+        self.changes = 0
+        self.captures = 0
+        self.removed = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "region": list(self.region),
+            "interval_s": round(self.interval, 3),
+            "polls": self.polls,
+            "changes": self.changes,
+            "captures": self.captures,
+        }
+
+
+class RegionWatcher:
+
+    def __init__(self, grab: Callable[[int, int, int, int], Image.Image],
+                 on_change: Callable[[Watch, Image.Image], None], signature_size: int = 32):
+        self._grab = grab
+        self._on_change = on_change
+        self.signature_size = signature_size
+
+        self._watches: Dict[str, Watch] = {}
+        self._heap: List[Tuple[float, int, Watch]] = []
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def add_watch(self, name: str, region: Sequence[int], **opts: Any) -> Watch:
+        w = Watch(name, region, **opts)
+        with self._cond:
+            old = self._watches.get(name)
+            if old is not None:
+                old.removed = True
+            self._watches[name] = w
+            self._schedule(w, time.monotonic())
+            self._cond.notify()
+        return w
+
+    def remove_watch(self, name: str) -> bool:
+        with self._cond:
+            w = self._watches.pop(name, None)
+            if w is None:
+                return False
+            w.removed = True
+            self._cond.notify()
+        return True
+
+    def _schedule(self, w: Watch, at: float) -> None:
+        self._seq += 1
+        heapq.heappush(self._heap, (at, self._seq, w))
+
+    def start(self) -> None:
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="swip-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            if not self._running:
+                return
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _signature(self, image: Image.Image) -> Image.Image:
+        s = self.signature_size
+        return image.resize((s, s), Image.Resampling.BOX).convert('L')
+
+    def _changed(self, w: Watch, sig: Image.Image) -> bool:
+        if w.signature is None:
+            return False
+        hist = ImageChops.difference(sig, w.signature).histogram()
+        n = sum(hist[w.pixel_threshold:])
+        return n >= w.threshold * sig.width * sig.height
+
+    def poll(self, w: Watch) -> bool:
+        image = self._grab(*w.region)
+        sig = self._signature(image)
+        changed = self._changed(w, sig)
+        w.polls += 1
+
+        if changed:
+            w.changes += 1
+            w.interval = w.min_interval
+            now = time.monotonic()
+            # During the cooldown the old signature is kept, so the change
+            # is still seen, and captured, once the cooldown is over.
+            if now - w.last_capture >= w.cooldown:
+                w.signature = sig
+                w.last_capture = now
+                w.captures += 1
+                try:
+                    self._on_change(w, image)
+                except Exception as e:
+                    logger.error(f"Watch {w.name} capture failed: {e}")
+        else:
+            w.signature = sig
+            w.interval = min(w.max_interval, w.interval * w.backoff)
+
+        return changed
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running:
+                    while self._heap and self._heap[0][2].removed:
+                        heapq.heappop(self._heap)
+                    if self._heap:
+                        wait = self._heap[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                    else:
+                        wait = None
+                    self._cond.wait(wait)
+                if not self._running:
+                    return
+                _, _, w = heapq.heappop(self._heap)
+
+            try:
+                self.poll(w)
+            except Exception as e:
+                logger.warning(f"Watch {w.name} poll failed: {e}")
+                w.interval = min(w.max_interval, w.interval * w.backoff)
+
+            with self._cond:
+                if not w.removed:
+                    self._schedule(w, time.monotonic() + w.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {name: w.stats() for name, w in self._watches.items()}
@@ -0,0 +1,279 @@
+import math
+from typing import List, Optional, Tuple
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QScrollArea,
+    QWidget, QInputDialog, QButtonGroup, QLabel
+)
+from PyQt6.QtCore import Qt, QRect, QPoint, QPointF, pyqtSignal
+from PyQt6.QtGui import (
+    QPainter, QColor, QPen, QFont, QImage, QPolygonF, QKeySequence, QShortcut
+)
+
+from src.ui.tilehistory import TileHistory
+
+
+TOOLS = ("arrow", "box", "text", "highlight", "redact", "crop")
+
+PEN_COLOR = QColor(230, 30, 30)
+HIGHLIGHT_COLOR = QColor(255, 230, 0, 90)
+PEN_WIDTH = 3
+ARROW_HEAD = 14
+
+
+def _draw_marker(p: QPainter, r: QRect, redact: bool) -> None:
+    if redact:
+        p.fillRect(r, QColor(0, 0, 0, 140))
+    p.setPen(QPen(QColor(0, 120, 215), 1, Qt.PenStyle.DashLine))
+    p.setBrush(Qt.BrushStyle.NoBrush)
+    p.drawRect(r)
+
+
+class _Canvas(QWidget):
+
+    changed = pyqtSignal()
+
+    def __init__(self, image: QImage, history: TileHistory, parent=None):
+        super().__init__(parent)
+        self.image = image
+        self.history = history
+        self.tool = "arrow"
+        self._p1: Optional[QPoint] = None
+        self._p2: Optional[QPoint] = None
+        self.setFixedSize(image.width(), image.height())
+        self.setMouseTracking(False)
+
+    def _shape_bounds(self, p1: QPoint, p2: QPoint) -> QRect:
+        m = ARROW_HEAD + PEN_WIDTH
+        return QRect(p1, p2).normalized().adjusted(-m, -m, m, m)
+
+    def _draw_shape(self, p: QPainter, p1: QPoint, p2: QPoint) -> None:
+        p.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+
+        if self.tool == "highlight":
+            p.fillRect(QRect(p1, p2).normalized(), HIGHLIGHT_COLOR)
+            return
+
+        if self.tool in ("crop", "redact"):
+            _draw_marker(p, QRect(p1, p2).normalized(), self.tool == "redact")
+            return
+
+        p.setPen(QPen(PEN_COLOR, PEN_WIDTH))
+        if self.tool == "box":
+            p.drawRect(QRect(p1, p2).normalized())
+            return
+
+        p.drawLine(p1, p2)
+        ang = math.atan2(p2.y() - p1.y(), p2.x() - p1.x())
+        head = QPolygonF([
+            QPointF(p2),
+            QPointF(p2.x() - ARROW_HEAD * math.cos(ang - 0.4), p2.y() - ARROW_HEAD * math.sin(ang - 0.4)),
+            QPointF(p2.x() - ARROW_HEAD * math.cos(ang + 0.4), p2.y() - ARROW_HEAD * math.sin(ang + 0.4)),
+        ])
+        p.setBrush(PEN_COLOR)
+        p.drawPolygon(head)
+
+    def _apply(self, rect: QRect, label: str, paint) -> None:
+        self.history.begin(rect)
+        p = QPainter(self.image)
+        paint(p)
+        p.end()
+        self.history.commit(label)
+        self.update(rect)
+        self.changed.emit()
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.MouseButton.LeftButton:
+            return
+
+        pos = event.pos()
+        if self.tool == "text":
+            txt, ok = QInputDialog.getText(self, "Add Text", "Text:")
+            if ok and txt:
+                self._add_text(pos, txt, QFont("Arial", 16, QFont.Weight.Bold))
+            return
+
+        self._p1 = pos
+        self._p2 = pos
+
+    def _add_text(self, pos: QPoint, txt: str, fnt: QFont) -> None:
+        p = QPainter(self.image)
+        p.setFont(fnt)
+        br = p.fontMetrics().boundingRect(txt).translated(pos).adjusted(-2, -2, 2, 2)
+        p.end()
+
+        def paint(pp: QPainter):
+            pp.setRenderHint(QPainter.RenderHint.TextAntialiasing, True)
+            pp.setFont(fnt)
+            pp.setPen(PEN_COLOR)
+            pp.drawText(pos, txt)
+
+        self._apply(br, "text", paint)
+
+    def mouseMoveEvent(self, event):
+        if self._p1 is None:
+            return
+        old = self._shape_bounds(self._p1, self._p2)
+        self._p2 = event.pos()
+        self.update(old.united(self._shape_bounds(self._p1, self._p2)))
+
+    def mouseReleaseEvent(self, event):
+        if event.button() != Qt.MouseButton.LeftButton or self._p1 is None:
+            return
+
+        p1, p2 = self._p1, event.pos()
+        self._p1 = self._p2 = None
+
+        if p1 == p2:
+            self.update(self._shape_bounds(p1, p2))
+            return
+
+        if self.tool == "crop":
+            self.history.set_crop(QRect(p1, p2))
+            self.update()
+            self.changed.emit()
+            return
+
+        if self.tool == "redact":
+            self.history.add_mark(QRect(p1, p2))
+            self.update(self._shape_bounds(p1, p2))
+            self.changed.emit()
+            return
+
+        self._apply(self._shape_bounds(p1, p2), self.tool, lambda p: self._draw_shape(p, p1, p2))
+
+    def paintEvent(self, event):
+        r = event.rect()
+        p = QPainter(self)
+        p.drawImage(r, self.image, r)
+
+        # Redactions are only previewed here; they are applied to the saved
+        # image by the capture pipeline.
+        for m in self.history.marks:
+            if m.intersects(r):
+                _draw_marker(p, m, True)
+
+        crop = self.history.crop
+        if crop is not None:
+            shade = QColor(0, 0, 0, 120)
+            full = self.rect()
+            p.fillRect(QRect(full.left(), full.top(), full.width(), crop.top()), shade)
+            p.fillRect(QRect(full.left(), crop.bottom() + 1, full.width(), full.bottom() - crop.bottom()), shade)
+            p.fillRect(QRect(full.left(), crop.top(), crop.left(), crop.height()), shade)
+            p.fillRect(QRect(crop.right() + 1, crop.top(), full.right() - crop.right(), crop.height()), shade)
+
+        if self._p1 is not None:
+            self._draw_shape(p, self._p1, self._p2)
+
+        p.end()
+
+
+class AnnotationEditor(QDialog):
+
+    def __init__(self, image: QImage, max_history_bytes: int = 64 * 1024 * 1024, parent=None):
+        super().__init__(parent)
+        self.image = image.convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+        self.history = TileHistory(self.image, max_bytes=max_history_bytes)
+        self.canvas = _Canvas(self.image, self.history)
+
+        self._setup_ui()
+
+    def _setup_ui(self):
+        self.setWindowTitle("Edit Screenshot")
+        self.setModal(True)
+
+        l = QVBoxLayout()
+
+        tl = QHBoxLayout()
+        self.tool_group = QButtonGroup(self)
+        for t in TOOLS:
+            b = QPushButton(t.title())
+            b.setCheckable(True)
+            b.setChecked(t == self.canvas.tool)
+            b.clicked.connect(lambda _, tool=t: self._set_tool(tool))
+            self.tool_group.addButton(b)
+            tl.addWidget(b)
+
+        tl.addStretch()
+
+        self.undo_btn = QPushButton("Undo")
+        self.undo_btn.clicked.connect(self.undo)
+        tl.addWidget(self.undo_btn)
+
+        self.redo_btn = QPushButton("Redo")
+        self.redo_btn.clicked.connect(self.redo)
+        tl.addWidget(self.redo_btn)
+
+        l.addLayout(tl)
+
+        sa = QScrollArea()
+        sa.setWidget(self.canvas)
+        sa.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        l.addWidget(sa)
+
+        bl = QHBoxLayout()
+        self.mem_label = QLabel()
+        self.mem_label.setStyleSheet("color: #666; font-size: 10px;")
+        bl.addWidget(self.mem_label)
+        bl.addStretch()
+
+        cb = QPushButton("Cancel")
+        cb.clicked.connect(self.reject)
+        bl.addWidget(cb)
+
+        sb = QPushButton("Save")
+        sb.setDefault(True)
+        sb.clicked.connect(self.accept)
+        bl.addWidget(sb)
+
+        l.addLayout(bl)
+        self.setLayout(l)
+
+        QShortcut(QKeySequence.StandardKey.Undo, self, activated=self.undo)
+        QShortcut(QKeySequence.StandardKey.Redo, self, activated=self.redo)
+
+        self.canvas.changed.connect(self._refresh_state)
+        self._refresh_state()
+
+        scr = self.screen().availableGeometry() if self.screen() else None
+        if scr is not None:
+            self.resize(
+                min(self.image.width() + 60, int(scr.width() * 0.9)),
+                min(self.image.height() + 120, int(scr.height() * 0.9)),
+            )
+
+    def _set_tool(self, tool: str):
+        self.canvas.tool = tool
+
+    def _refresh_state(self):
+        self.undo_btn.setEnabled(self.history.can_undo())
+        self.redo_btn.setEnabled(self.history.can_redo())
+        self.mem_label.setText(f"History: {self.history.memory_bytes() / (1024 * 1024):.1f} MB")
+
+    def undo(self):
+        r = self.history.undo()
+        if r is not None:
+            self.canvas.update(r)
+        self._refresh_state()
+
+    def redo(self):
+        r = self.history.redo()
+        if r is not None:
+            self.canvas.update(r)
+        self._refresh_state()
+
+    def crop_offset(self) -> Tuple[int, int]:
+        crop = self.history.crop
+        if crop is not None and not crop.isEmpty():
+            return crop.x(), crop.y()
+        return 0, 0
+
+    def redactions(self) -> List[Tuple[int, int, int, int]]:
+        ox, oy = self.crop_offset()
+        return [(m.x() - ox, m.y() - oy, m.width(), m.height()) for m in self.history.marks]
+
+    def result_image(self) -> QImage:
+        crop = self.history.crop
+        if crop is not None and not crop.isEmpty():
+            return self.image.copy(crop)
+        return self.image
@@ -0,0 +1,29 @@
+from PIL import Image
+from PyQt6.QtGui import QImage
+
+
+def pil_to_qimage(image: Image.Image) -> QImage:
+    if image.mode == 'RGBA':
+        d = image.tobytes('raw', 'RGBA')
+        qi = QImage(d, image.width, image.height, image.width * 4, QImage.Format.Format_RGBA8888)
+    else:
+        img = image if image.mode == 'RGB' else image.convert('RGB')
+        d = img.tobytes('raw', 'RGB')
+        qi = QImage(d, img.width, img.height, img.width * 3, QImage.Format.Format_RGB888)
+    return qi.copy()
+
+
+def qimage_to_pil(qimage: QImage, mode: str = 'RGB') -> Image.Image:
+    if mode == 'L':
+        fmt, raw = QImage.Format.Format_Grayscale8, 'L'
+    elif mode == 'RGBA':
+        fmt, raw = QImage.Format.Format_RGBA8888, 'RGBA'
+    else:
+        fmt, raw = QImage.Format.Format_RGB888, 'RGB'
+
+    qi = qimage.convertToFormat(fmt)
+    ptr = qi.constBits()
+    ptr.setsize(qi.sizeInBytes())
+    return Image.frombuffer(
+        mode, (qi.width(), qi.height()), bytes(ptr), 'raw', raw, qi.bytesPerLine(), 1
+    )
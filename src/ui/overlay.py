@@ -1,7 +1,21 @@
 from PyQt6.QtWidgets import QWidget, QApplication
 from PyQt6.QtCore import Qt, QRect, QPoint, pyqtSignal
-from PyQt6.QtGui import QPainter, QColor, QPen, QFont
+from PyQt6.QtGui import QPainter, QColor, QPen, QFont, QImage
 from typing import Optional, Tuple
+import logging
+import threading
+
+from src.services.snapping import SnapIndex, build_snap_index
+from src.ui.imageconv import qimage_to_pil
+
+
+logger = logging.getLogger(__name__)
+
+
+LOUPE_PIXELS = 15
+LOUPE_ZOOM = 8
+LOUPE_INFO_HEIGHT = 22
+LOUPE_OFFSET = 20
 
 
 class OverlayWindow(QWidget):
@@ -20,6 +34,16 @@ class OverlayWindow(QWidget):
         self.end = None
         self.selecting = False
         
+        self.snapping_enabled = True
+        self.snap_tolerance = 8
+        self._frame: Optional[QImage] = None
+        self._snap_index: Optional[SnapIndex] = None
+        self._snap_gen = 0
+        
+        self.magnifier_enabled = True
+        self.release_on_hide = False
+        self._cursor_pos: Optional[QPoint] = None
+        
         self._setup_window()
     
     def _setup_window(self):
@@ -44,6 +68,8 @@ class OverlayWindow(QWidget):
         self.start = None
         self.end = None
         
+        self._freeze_frame()
+        
         self.showFullScreen()
         self.raise_()
         self.activateWindow()
@@ -54,6 +80,66 @@ class OverlayWindow(QWidget):
         self._start_pos = None
         self._end_pos = None
         self._is_selecting = False
+        
+        self._snap_gen += 1
+        self._snap_index = None
+        self._frame = None
+        self._cursor_pos = None
+        
+        if self.release_on_hide:
+            # Drops the native window and its full-screen backing store;
+            # Qt recreates both on the next show.
+            self.destroy()
+    
+    def frame_bytes(self) -> int:
+        fr = self._frame
+        return fr.sizeInBytes() if fr is not None else 0
+    
+    def _freeze_frame(self):
+        self._snap_gen += 1
+        self._snap_index = None
+        self._frame = None
+        
+        scr = self.screen() or QApplication.primaryScreen()
+        if scr is None:
+            return
+        
+        self._frame = scr.grabWindow(0).toImage()
+        if self._frame.isNull() or not self.snapping_enabled:
+            return
+        
+        g = scr.geometry()
+        dpr = scr.devicePixelRatio()
+        origin = (int(g.x() * dpr), int(g.y() * dpr))
+        
+        t = threading.Thread(
+            target=self._build_snap_index,
+            args=(self._snap_gen, self._frame, origin, dpr),
+            name="swip-snap",
+            daemon=True,
+        )
+        t.start()
+    
+    def _build_snap_index(self, gen: int, frame: QImage, origin: Tuple[int, int], dpr: float):
+        try:
+            img = qimage_to_pil(frame, 'L')
+            idx = build_snap_index(img, origin, dpr)
+        except Exception as e:
+            logger.warning(f"Failed to build snap index: {e}")
+            return
+        
+        if gen == self._snap_gen:
+            self._snap_index = idx
+    
+    def _snap_point(self, pos: QPoint, modifiers=None) -> QPoint:
+        idx = self._snap_index
+        if idx is None or not self.snapping_enabled:
+            return pos
+        if modifiers is not None and modifiers & Qt.KeyboardModifier.AltModifier:
+            return pos
+        
+        x, y = idx.snap(pos.x(), pos.y(), self.snap_tolerance)
+        return QPoint(x, y)
     
     def draw_selection(self, start_pos: QPoint, end_pos: QPoint):
         self._start_pos = start_pos
@@ -78,24 +164,106 @@ class OverlayWindow(QWidget):
         
         return (x1, y1, w, h)
     
+    def _selection_dirty_rect(self) -> QRect:
+        bnds = self.get_selection_bounds()
+        if bnds is None:
+            return QRect()
+        x, y, w, h = bnds
+        # Covers the pen width and the size label drawn above/below the box.
+        return QRect(x, y, w, h).adjusted(-80, -40, 80, 40)
+    
+    def _loupe_rect(self) -> QRect:
+        pos = self._cursor_pos
+        if pos is None or self._frame is None or not self.magnifier_enabled:
+            return QRect()
+        
+        w = LOUPE_PIXELS * LOUPE_ZOOM + 2
+        h = w + LOUPE_INFO_HEIGHT
+        
+        x = pos.x() + LOUPE_OFFSET
+        y = pos.y() + LOUPE_OFFSET
+        if x + w > self.width():
+            x = pos.x() - LOUPE_OFFSET - w
+        if y + h > self.height():
+            y = pos.y() - LOUPE_OFFSET - h
+        
+        return QRect(x, y, w, h)
+    
+    def _paint_loupe(self, p: QPainter):
+        lr = self._loupe_rect()
+        if lr.isNull():
+            return
+        
+        fr = self._frame
+        dpr = fr.devicePixelRatio() or 1.0
+        px = int(self._cursor_pos.x() * dpr)
+        py = int(self._cursor_pos.y() * dpr)
+        half = LOUPE_PIXELS // 2
+        
+        zr = QRect(lr.x() + 1, lr.y() + 1, LOUPE_PIXELS * LOUPE_ZOOM, LOUPE_PIXELS * LOUPE_ZOOM)
+        
+        p.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        p.fillRect(lr, QColor(30, 30, 30))
+        p.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+        
+        # Source rects are in the frame's physical pixels, regardless of its DPR.
+        src = QRect(px - half, py - half, LOUPE_PIXELS, LOUPE_PIXELS)
+        p.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
+        p.drawImage(zr, fr, src)
+        
+        p.setPen(QPen(QColor(255, 255, 255, 40), 1))
+        for i in range(1, LOUPE_PIXELS):
+            o = i * LOUPE_ZOOM
+            p.drawLine(zr.x() + o, zr.y(), zr.x() + o, zr.bottom())
+            p.drawLine(zr.x(), zr.y() + o, zr.right(), zr.y() + o)
+        
+        p.setPen(QPen(QColor(0, 120, 215), 2))
+        p.drawRect(zr.x() + half * LOUPE_ZOOM, zr.y() + half * LOUPE_ZOOM, LOUPE_ZOOM, LOUPE_ZOOM)
+        
+        if 0 <= px < fr.width() and 0 <= py < fr.height():
+            c = fr.pixelColor(px, py)
+            txt = f"{self._cursor_pos.x()}, {self._cursor_pos.y()}  {c.name().upper()}"
+        else:
+            c = None
+            txt = f"{self._cursor_pos.x()}, {self._cursor_pos.y()}"
+        
+        ir = QRect(lr.x(), zr.bottom() + 1, lr.width(), LOUPE_INFO_HEIGHT)
+        if c is not None:
+            p.fillRect(ir.x() + 4, ir.y() + 5, 12, 12, c)
+        
+        p.setFont(QFont("Arial", 9))
+        p.setPen(QColor(255, 255, 255))
+        p.drawText(ir.adjusted(20, 0, -2, 0),
+                   Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, txt)
+    
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
-            self._start_pos = event.pos()
-            self._end_pos = event.pos()
+            pos = self._snap_point(event.pos(), event.modifiers())
+            self._start_pos = pos
+            self._end_pos = pos
             self._is_selecting = True
             self.selecting = True
             self.update()
     
     def mouseMoveEvent(self, event):
+        old_loupe = self._loupe_rect()
+        self._cursor_pos = event.pos()
+        
         if self._is_selecting:
-            self._end_pos = event.pos()
-            self.end = event.pos()
-            self.update()
+            old_sel = self._selection_dirty_rect()
+            pos = self._snap_point(event.pos(), event.modifiers())
+            self._end_pos = pos
+            self.end = pos
+            self.update(old_sel.united(self._selection_dirty_rect()))
+        
+        if self.magnifier_enabled and self._frame is not None:
+            self.update(old_loupe)
+            self.update(self._loupe_rect())
     
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton and self._is_selecting:
             self._is_selecting = False
-            self._end_pos = event.pos()
+            self._end_pos = self._snap_point(event.pos(), event.modifiers())
             
             bnds = self.get_selection_bounds()
             if bnds:
@@ -147,6 +315,8 @@ class OverlayWindow(QWidget):
                     p.setPen(QColor(255, 255, 255))
                     p.drawText(tx, ty, txt)
         
+        self._paint_loupe(p)
+        
         p.end()
     
     def keyPressEvent(self, event):
@@ -7,6 +7,8 @@ from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QKeySequence, QKeyEvent
 from typing import Dict, Optional
 
+from src.utils.config import normalize_keybind
+
 
 class KeybindEdit(QLineEdit):
     
@@ -88,6 +90,7 @@ class SettingsDialog(QDialog):
         self.original_keybinds: Dict[str, str] = {}
         self.orig_kb = {}
         self.auto_save_cb = None
+        self.edit_cb = None
         
         self._setup_ui()
         self._load_current_settings()
@@ -128,6 +131,20 @@ class SettingsDialog(QDialog):
         self.keybind_edits["fullscreen_capture"] = fe
         fl.addRow("Fullscreen Capture:", fe)
         
+        se = KeybindEdit()
+        se.keybind_captured.connect(
+            lambda kb: self._validate_keybind("scroll_capture", kb)
+        )
+        self.keybind_edits["scroll_capture"] = se
+        fl.addRow("Scrolling Capture:", se)
+        
+        le = KeybindEdit()
+        le.keybind_captured.connect(
+            lambda kb: self._validate_keybind("repeat_last_region", kb)
+        )
+        self.keybind_edits["repeat_last_region"] = le
+        fl.addRow("Repeat Last Region:", le)
+        
         hl = QLabel(
             "Click on a field and press your desired key combination.\n"
             "Example: Ctrl+Shift+S"
@@ -145,6 +162,9 @@ class SettingsDialog(QDialog):
         self.auto_save_cb = QCheckBox("Auto Save to Clipboard")
         l.addWidget(self.auto_save_cb)
         
+        self.edit_cb = QCheckBox("Edit Before Saving")
+        l.addWidget(self.edit_cb)
+        
         g.setLayout(l)
         return g
     
@@ -177,9 +197,21 @@ class SettingsDialog(QDialog):
         
         if self.auto_save_cb:
             self.auto_save_cb.setChecked(self.config_manager.get_auto_save_clipboard())
+        
+        if self.edit_cb:
+            self.edit_cb.setChecked(self.config_manager.get_edit_before_save())
+    
+    def _check_keybind(self, action: str, keybind: str):
+        iv, em = self.config_manager.validate_keybind(keybind, check_conflicts=True, action=action)
+        if not iv and self.config_manager.get_keybind_owner(keybind) in self.keybind_edits:
+            # The other shortcuts in this dialog may be changing as well
+            # (e.g. two being swapped); clashes between them are checked
+            # against the edits instead of the saved config.
+            iv, em = self.config_manager.validate_keybind(keybind)
+        return iv, em
     
     def _validate_keybind(self, action: str, keybind: str):
-        iv, em = self.config_manager.validate_keybind(keybind, check_conflicts=False)
+        iv, em = self._check_keybind(action, keybind)
         
         if not iv:
             QMessageBox.warning(
@@ -190,8 +222,9 @@ class SettingsDialog(QDialog):
             self.keybind_edits[action].setText(self.original_keybinds[action])
             return
         
+        nkb = normalize_keybind(keybind)
         for oa, oe in self.keybind_edits.items():
-            if oa != action and oe.text() == keybind:
+            if oa != action and normalize_keybind(oe.text()) == nkb:
                 QMessageBox.warning(
                     self,
                     "Keybind Conflict",
@@ -220,6 +253,9 @@ class SettingsDialog(QDialog):
             
             if self.auto_save_cb:
                 self.auto_save_cb.setChecked(self.config_manager.DEFAULT_CONFIG["auto_save_clipboard"])
+            
+            if self.edit_cb:
+                self.edit_cb.setChecked(self.config_manager.DEFAULT_CONFIG["edit_before_save"])
     
     def _save_settings(self):
         nk = {}
@@ -234,7 +270,7 @@ class SettingsDialog(QDialog):
                 )
                 return
             
-            iv, em = self.config_manager.validate_keybind(kb, check_conflicts=False)
+            iv, em = self._check_keybind(act, kb)
             if not iv:
                 QMessageBox.warning(
                     self,
@@ -245,7 +281,7 @@ class SettingsDialog(QDialog):
             
             nk[act] = kb
         
-        kv = list(nk.values())
+        kv = [normalize_keybind(kb) for kb in nk.values()]
         if len(kv) != len(set(kv)):
             QMessageBox.warning(
                 self,
@@ -260,6 +296,9 @@ class SettingsDialog(QDialog):
         if self.auto_save_cb:
             self.config_manager.set_auto_save_clipboard(self.auto_save_cb.isChecked())
         
+        if self.edit_cb:
+            self.config_manager.set_edit_before_save(self.edit_cb.isChecked())
+        
         self.config_manager.save_config()
         
         self.settings_saved.emit(nk)
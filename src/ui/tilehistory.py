@@ -0,0 +1,143 @@
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QRect
+from PyQt6.QtGui import QImage, QPainter
+
+
+TileKey = Tuple[int, int]
+
+
+class _Entry:
+
+    def __init__(self, label: str, tiles: Optional[Dict[TileKey, QImage]] = None,
+                 rect: Optional[QRect] = None, kind: str = "tiles"):
+        self.label = label
+        self.tiles = tiles or {}
+        self.rect = rect
+        self.kind = kind
+        self.applied = True
+        self.nbytes = sum(t.sizeInBytes() for t in self.tiles.values())
+
+
+class TileHistory:
+
+    def __init__(self, image: QImage, tile_size: int = 128, max_bytes: int = 64 * 1024 * 1024):
+        self.image = image
+        self.tile_size = tile_size
+        self.max_bytes = max_bytes
+        self.crop: Optional[QRect] = None
+        self.marks: List[QRect] = []
+
+        self._undo: Deque[_Entry] = deque()
+        self._redo: List[_Entry] = []
+        self._pending: Optional[Dict[TileKey, QImage]] = None
+        self._bytes = 0
+
+    def _tile_rect(self, key: TileKey) -> QRect:
+        ts = self.tile_size
+        return QRect(key[0] * ts, key[1] * ts, ts, ts).intersected(self.image.rect())
+
+    def _tiles_for(self, rect: QRect) -> List[TileKey]:
+        r = rect.intersected(self.image.rect())
+        if r.isEmpty():
+            return []
+        ts = self.tile_size
+        return [
+            (tx, ty)
+            for ty in range(r.top() // ts, r.bottom() // ts + 1)
+            for tx in range(r.left() // ts, r.right() // ts + 1)
+        ]
+
+    def begin(self, rect: QRect) -> None:
+        self._pending = {k: self.image.copy(self._tile_rect(k)) for k in self._tiles_for(rect)}
+
+    def cancel(self) -> None:
+        self._pending = None
+
+    def commit(self, label: str) -> None:
+        if self._pending is None:
+            return
+        tiles, self._pending = self._pending, None
+        # begin() saves the whole bounding box; a diagonal arrow or a text
+        # box only touches a few of those tiles, so keep just the ones the
+        # paint actually changed.
+        tiles = {k: t for k, t in tiles.items() if t != self.image.copy(self._tile_rect(k))}
+        if tiles:
+            self._push(_Entry(label, tiles))
+
+    def set_crop(self, rect: Optional[QRect]) -> None:
+        if rect is not None:
+            rect = rect.normalized().intersected(self.image.rect())
+        self._push(_Entry("crop", rect=self.crop, kind="crop"))
+        self.crop = rect
+
+    def add_mark(self, rect: QRect) -> None:
+        rect = rect.normalized().intersected(self.image.rect())
+        if rect.isEmpty():
+            return
+        self.marks.append(rect)
+        self._push(_Entry("mark", rect=rect, kind="mark"))
+
+    def _push(self, entry: _Entry) -> None:
+        for e in self._redo:
+            self._bytes -= e.nbytes
+        self._redo = []
+
+        self._undo.append(entry)
+        self._bytes += entry.nbytes
+
+        # The newest edit is always kept, even on its own over max_bytes,
+        # so the last step can be undone.
+        while self._bytes > self.max_bytes and len(self._undo) > 1:
+            self._bytes -= self._undo.popleft().nbytes
+
+    def _swap(self, entry: _Entry) -> QRect:
+        if entry.kind == "crop":
+            entry.rect, self.crop = self.crop, entry.rect
+            return self.image.rect()
+
+        if entry.kind == "mark":
+            if entry.applied:
+                self.marks.remove(entry.rect)
+            else:
+                self.marks.append(entry.rect)
+            entry.applied = not entry.applied
+            return entry.rect.adjusted(-2, -2, 2, 2)
+
+        # Undo and redo both swap the stored tiles with the live pixels, so
+        # an entry only ever holds one version of each dirty tile.
+        dirty = QRect()
+        p = QPainter(self.image)
+        p.setCompositionMode(QPainter.CompositionMode.CompositionMode_Source)
+        for k, tile in entry.tiles.items():
+            tr = self._tile_rect(k)
+            cur = self.image.copy(tr)
+            p.drawImage(tr.topLeft(), tile)
+            entry.tiles[k] = cur
+            dirty = dirty.united(tr)
+        p.end()
+        return dirty
+
+    def undo(self) -> Optional[QRect]:
+        if not self._undo:
+            return None
+        e = self._undo.pop()
+        self._redo.append(e)
+        return self._swap(e)
+
+    def redo(self) -> Optional[QRect]:
+        if not self._redo:
+            return None
+        e = self._redo.pop()
+        self._undo.append(e)
+        return self._swap(e)
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def memory_bytes(self) -> int:
+        return self._bytes
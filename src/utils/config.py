@@ -2,9 +2,82 @@ import copy
 import json
 import os
 import re
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple
-import keyboard
+from typing import Dict, Any, List, Optional, Tuple
+
+from src.utils.atomicfile import write_atomic
+from src.utils.ipc import default_socket_path
+
+
+VALID_MODIFIERS = frozenset({'ctrl', 'shift', 'alt', 'win', 'cmd', 'super'})
+
+VALID_KEYS = frozenset(
+    list('abcdefghijklmnopqrstuvwxyz0123456789')
+    + [f'f{i}' for i in range(1, 25)]
+    + ['space', 'enter', 'return', 'tab', 'backspace', 'delete',
+       'escape', 'esc', 'up', 'down', 'left', 'right',
+       'home', 'end', 'pageup', 'pagedown', 'insert',
+       'plus', 'minus', 'multiply', 'divide']
+)
+
+_MODIFIER_ORDER = {'ctrl': 0, 'shift': 1, 'alt': 2, 'win': 3}
+_ALIASES = {'cmd': 'win', 'super': 'win', 'esc': 'escape', 'return': 'enter'}
+
+_KEYBIND_RE = re.compile(r'^[a-z0-9]+(?:\+[a-z0-9]+)+$')
+_SEP_RE = re.compile(r'\s*\+\s*')
+
+# Keybind actions for region presets are "region_preset:<name>"; their
+# combos live on the preset entries rather than under "keybinds".
+PRESET_ACTION_PREFIX = 'region_preset:'
+
+RESERVED_KEYBINDS = frozenset({
+    'ctrl+alt+delete', 'ctrl+shift+escape', 'ctrl+escape',
+    'alt+tab', 'alt+f4', 'alt+escape', 'shift+alt+tab',
+    'win+l', 'win+d', 'win+tab', 'win+q', 'win+w',
+})
+
+
+@lru_cache(maxsize=512)
+def _parse_keybind(key_combo: str) -> Tuple[Optional[str], Optional[str]]:
+    norm = _SEP_RE.sub('+', key_combo.strip().lower())
+
+    if '+' not in norm:
+        return None, "Keybind must contain at least one modifier (e.g., 'ctrl+s')"
+
+    if not _KEYBIND_RE.match(norm):
+        return None, "Keybind must have at least one modifier and one key"
+
+    pts = norm.split('+')
+    mods = pts[:-1]
+    k = pts[-1]
+
+    for m in mods:
+        if m not in VALID_MODIFIERS:
+            return None, f"Invalid modifier: '{m}'. Valid modifiers: {', '.join(sorted(VALID_MODIFIERS))}"
+
+    if k not in VALID_KEYS and k not in VALID_MODIFIERS:
+        return None, f"Invalid key: '{k}'"
+
+    cmods = [_ALIASES.get(m, m) for m in mods]
+    ck = _ALIASES.get(k, k)
+    # A modifier-only combo ('ctrl+shift') has no key to keep last, so all
+    # of its tokens are put in canonical order.
+    if ck in _MODIFIER_ORDER:
+        cmods.append(ck)
+        ck = None
+    if len(cmods) != len(set(cmods)):
+        return None, "Keybind contains duplicate modifiers"
+
+    cmods.sort(key=_MODIFIER_ORDER.__getitem__)
+    return '+'.join(cmods if ck is None else cmods + [ck]), None
+
+
+def normalize_keybind(key_combo: str) -> Optional[str]:
+    if not key_combo:
+        return None
+    return _parse_keybind(key_combo)[0]
 
 
 class ConfigManager:
@@ -13,9 +86,78 @@ class ConfigManager:
         "keybinds": {
             "overlay_toggle": "ctrl+shift+s",
             "fullscreen_capture": "ctrl+shift+f",
+            "scroll_capture": "ctrl+shift+d",
+            "repeat_last_region": "ctrl+shift+l",
         },
         "auto_save_clipboard": True,
         "screenshot_directory": str(Path.home() / "Pictures" / "Screenshots"),
+        "ipc_enabled": True,
+        "ipc_socket": None,
+        "capture_queue": {
+            "max_jobs": 8,
+            "max_bytes": 512 * 1024 * 1024,
+            "policy": "block",
+            "workers": 2,
+        },
+        "png_streaming": {
+            "threshold_megapixels": 16,
+            "band_rows": 256,
+        },
+        "png_palette_reduction": True,
+        "redaction": {
+            "enabled": False,
+            "method": "pixelate",
+            "block_size": 12,
+            "blur_radius": 12,
+            "fill": [0, 0, 0],
+            "regions": [],
+        },
+        "export": {
+            "targets": [],
+            "concurrency": 2,
+            "max_attempts": 8,
+            "backoff_base": 1.0,
+            "backoff_max": 300.0,
+            "timeout": 30.0,
+            "dead_retention_days": 7,
+        },
+        "scroll_capture": {
+            "interval": 0.15,
+            "idle_frames": 12,
+            "max_height": 50000,
+            "auto_scroll_key": None,
+            "ignore_top": 0,
+            "ignore_bottom": 0,
+        },
+        "region_presets": [],
+        "last_region": None,
+        "watch_regions": [],
+        "schedules": [],
+        "low_memory": False,
+        "memory_tracing": False,
+        "edit_before_save": False,
+        "edit_history_mb": 64,
+        "snapping": True,
+        "magnifier": True,
+        "durability": {
+            "policy": "none",
+            "batch_interval": 1.0,
+        },
+        "stall_watchdog": {
+            "enabled": True,
+            "threshold_ms": 100,
+            "interval_ms": 50,
+            "max_reports": 100,
+        },
+        "recompression": {
+            "enabled": False,
+            "workers": 1,
+            "min_age": 3600,
+            "compress_level": 9,
+            "palette": True,
+            "rescan_interval": 3600,
+            "pause_on_battery": True,
+        },
     }
 
     def __init__(self, config_file: Optional[str] = None):
@@ -28,6 +170,7 @@ class ConfigManager:
         self.config_file = Path(config_file)
         self.config: Dict[str, Any] = {}
         self.cfg = None
+        self._keybind_index: Dict[str, str] = {}
         self.load_config()
 
     def load_config(self) -> None:
@@ -41,13 +184,33 @@ class ConfigManager:
         else:
             self.config = copy.deepcopy(self.DEFAULT_CONFIG)
 
+        self._rebuild_keybind_index()
+
+    def _rebuild_keybind_index(self) -> None:
+        idx = {}
+        kbs = dict(self.DEFAULT_CONFIG["keybinds"])
+        kbs.update(self.config.get("keybinds", {}))
+        for p in self.get_region_presets():
+            if p.get("keybind"):
+                kbs[PRESET_ACTION_PREFIX + p["name"]] = p["keybind"]
+        for act, kc in kbs.items():
+            n = normalize_keybind(kc)
+            if n:
+                idx.setdefault(n, act)
+        self._keybind_index = idx
+
     def save_config(self) -> None:
         self.config_file.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(self.config_file, "w") as f:
-            json.dump(self.config, f, indent=2)
+        # A torn config.json would silently reset every setting on the next
+        # load, so it is replaced atomically and fsynced.
+        write_atomic(self.config_file, json.dumps(self.config, indent=2).encode("utf-8"))
 
     def get_keybind(self, action: str) -> str:
+        if action.startswith(PRESET_ACTION_PREFIX):
+            p = self.get_region_preset(action[len(PRESET_ACTION_PREFIX):])
+            return (p or {}).get("keybind") or ""
+
         kb = self.config.get("keybinds", {}).get(
             action, self.DEFAULT_CONFIG["keybinds"].get(action, "")
         )
@@ -58,6 +221,13 @@ class ConfigManager:
             self.config["keybinds"] = {}
 
         self.config["keybinds"][action] = key_combo
+        self._rebuild_keybind_index()
+
+    def get_keybind_owner(self, key_combo: str) -> Optional[str]:
+        n = normalize_keybind(key_combo)
+        if n is None:
+            return None
+        return self._keybind_index.get(n)
 
     def get_screenshot_directory(self) -> str:
         d = self.config.get(
@@ -78,53 +248,175 @@ class ConfigManager:
     def set_auto_save_clipboard(self, enabled: bool) -> None:
         self.config["auto_save_clipboard"] = enabled
 
-    def validate_keybind(self, key_combo: str, check_conflicts: bool = False) -> Tuple[bool, Optional[str]]:
-        if not key_combo or not key_combo.strip():
-            return False, "Keybind cannot be empty"
+    def get_ipc_enabled(self) -> bool:
+        return self.config.get("ipc_enabled", self.DEFAULT_CONFIG["ipc_enabled"])
+
+    def set_ipc_enabled(self, enabled: bool) -> None:
+        self.config["ipc_enabled"] = enabled
 
-        norm = key_combo.strip().lower()
+    def get_ipc_socket_path(self) -> str:
+        p = self.config.get("ipc_socket", self.DEFAULT_CONFIG["ipc_socket"])
+        return p or default_socket_path()
 
-        v_mods = {'ctrl', 'shift', 'alt', 'win', 'cmd', 'super'}
-        
-        v_keys = set('abcdefghijklmnopqrstuvwxyz0123456789')
-        v_keys.update([f'f{i}' for i in range(1, 25)])
-        v_keys.update(['space', 'enter', 'return', 'tab', 'backspace', 'delete', 
-                          'escape', 'esc', 'up', 'down', 'left', 'right',
-                          'home', 'end', 'pageup', 'pagedown', 'insert',
-                          'plus', 'minus', 'multiply', 'divide'])
+    def get_capture_queue_settings(self) -> Dict[str, Any]:
+        st = dict(self.DEFAULT_CONFIG["capture_queue"])
+        st.update(self.config.get("capture_queue", {}))
+        return st
 
-        if '+' not in norm:
-            return False, "Keybind must contain at least one modifier (e.g., 'ctrl+s')"
+    def set_capture_queue_settings(self, **settings: Any) -> None:
+        self.config.setdefault("capture_queue", {}).update(settings)
 
-        pts = [p.strip() for p in norm.split('+')]
-        
-        if len(pts) < 2:
-            return False, "Keybind must have at least one modifier and one key"
+    def get_png_streaming_settings(self) -> Dict[str, Any]:
+        st = dict(self.DEFAULT_CONFIG["png_streaming"])
+        st.update(self.config.get("png_streaming", {}))
+        return st
 
-        mods = pts[:-1]
-        k = pts[-1]
+    def get_png_palette_reduction(self) -> bool:
+        return self.config.get(
+            "png_palette_reduction",
+            self.DEFAULT_CONFIG["png_palette_reduction"]
+        )
+
+    def set_png_palette_reduction(self, enabled: bool) -> None:
+        self.config["png_palette_reduction"] = enabled
+
+    def get_redaction_settings(self) -> Dict[str, Any]:
+        st = dict(self.DEFAULT_CONFIG["redaction"])
+        st.update(self.config.get("redaction", {}))
+        return st
+
+    def get_export_settings(self) -> Dict[str, Any]:
+        st = dict(self.DEFAULT_CONFIG["export"])
+        st.update(self.config.get("export", {}))
+        return st
+
+    def get_export_queue_path(self) -> str:
+        return str(self.config_file.parent / "export_queue.sqlite3")
+
+    def get_scroll_capture_settings(self) -> Dict[str, Any]:
+        st = dict(self.DEFAULT_CONFIG["scroll_capture"])
+        st.update(self.config.get("scroll_capture", {}))
+        return st
+
+    def get_region_presets(self) -> List[Dict[str, Any]]:
+        return list(self.config.get("region_presets", self.DEFAULT_CONFIG["region_presets"]))
+
+    def get_region_preset(self, name: str) -> Optional[Dict[str, Any]]:
+        for p in self.get_region_presets():
+            if p.get("name") == name:
+                return p
+        return None
+
+    def set_region_preset(self, name: str, region, keybind: Optional[str] = None) -> None:
+        x, y, w, h = (int(v) for v in region)
+        if w <= 0 or h <= 0:
+            raise ValueError("Region width and height must be positive")
+        if keybind:
+            iv, em = self.validate_keybind(keybind, check_conflicts=True,
+                                           action=PRESET_ACTION_PREFIX + name)
+            if not iv:
+                raise ValueError(em)
+
+        presets = [p for p in self.get_region_presets() if p.get("name") != name]
+        entry: Dict[str, Any] = {"name": name, "region": [x, y, w, h]}
+        if keybind:
+            entry["keybind"] = keybind
+        presets.append(entry)
+        self.config["region_presets"] = presets
+        self._rebuild_keybind_index()
+
+    def remove_region_preset(self, name: str) -> bool:
+        presets = self.get_region_presets()
+        kept = [p for p in presets if p.get("name") != name]
+        self.config["region_presets"] = kept
+        self._rebuild_keybind_index()
+        return len(kept) != len(presets)
+
+    def get_last_region(self) -> Optional[Tuple[int, int, int, int]]:
+        r = self.config.get("last_region", self.DEFAULT_CONFIG["last_region"])
+        return tuple(int(v) for v in r) if r else None
+
+    def set_last_region(self, region) -> None:
+        self.config["last_region"] = [int(v) for v in region]
+
+    def get_stall_watchdog_settings(self) -> Dict[str, Any]:
+        st = dict(self.DEFAULT_CONFIG["stall_watchdog"])
+        st.update(self.config.get("stall_watchdog", {}))
+        return st
+
+    def get_stall_report_path(self) -> str:
+        return str(self.config_file.parent / f"stalls-{time.strftime('%Y%m%d-%H%M%S')}.json")
+
+    def get_recompression_settings(self) -> Dict[str, Any]:
+        st = dict(self.DEFAULT_CONFIG["recompression"])
+        st.update(self.config.get("recompression", {}))
+        return st
 
-        for m in mods:
-            if m not in v_mods:
-                return False, f"Invalid modifier: '{m}'. Valid modifiers: {', '.join(sorted(v_mods))}"
+    def get_recompression_checkpoint_path(self) -> str:
+        return str(self.config_file.parent / "recompress_checkpoint.json")
 
-        if k not in v_keys and k not in v_mods:
-            return False, f"Invalid key: '{k}'"
+    def get_watch_regions(self) -> list:
+        return list(self.config.get("watch_regions", self.DEFAULT_CONFIG["watch_regions"]))
 
-        if len(mods) != len(set(mods)):
-            return False, "Keybind contains duplicate modifiers"
+    def set_watch_regions(self, watches: list) -> None:
+        self.config["watch_regions"] = watches
 
-        try:
-            keyboard.parse_hotkey(norm)
-        except Exception as e:
-            return False, f"Invalid keybind format: {str(e)}"
+    def get_schedules(self) -> list:
+        return list(self.config.get("schedules", self.DEFAULT_CONFIG["schedules"]))
+
+    def set_schedules(self, schedules: list) -> None:
+        self.config["schedules"] = schedules
+
+    def get_low_memory(self) -> bool:
+        return self.config.get("low_memory", self.DEFAULT_CONFIG["low_memory"])
+
+    def set_low_memory(self, enabled: bool) -> None:
+        self.config["low_memory"] = enabled
+
+    def get_memory_tracing(self) -> bool:
+        return self.config.get("memory_tracing", self.DEFAULT_CONFIG["memory_tracing"])
+
+    def get_edit_before_save(self) -> bool:
+        return self.config.get("edit_before_save", self.DEFAULT_CONFIG["edit_before_save"])
+
+    def set_edit_before_save(self, enabled: bool) -> None:
+        self.config["edit_before_save"] = enabled
+
+    def get_edit_history_bytes(self) -> int:
+        mb = self.config.get("edit_history_mb", self.DEFAULT_CONFIG["edit_history_mb"])
+        return int(mb * 1024 * 1024)
+
+    def get_snapping_enabled(self) -> bool:
+        return self.config.get("snapping", self.DEFAULT_CONFIG["snapping"])
+
+    def get_magnifier_enabled(self) -> bool:
+        return self.config.get("magnifier", self.DEFAULT_CONFIG["magnifier"])
+
+    def get_durability_settings(self) -> Dict[str, Any]:
+        st = dict(self.DEFAULT_CONFIG["durability"])
+        st.update(self.config.get("durability", {}))
+        return st
+
+    def set_durability_policy(self, policy: str) -> None:
+        self.config.setdefault("durability", {})["policy"] = policy
+
+    def validate_keybind(self, key_combo: str, check_conflicts: bool = False,
+                         action: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        if not key_combo or not key_combo.strip():
+            return False, "Keybind cannot be empty"
+
+        n, err = _parse_keybind(key_combo)
+        if n is None:
+            return False, err
 
         if check_conflicts:
-            try:
-                tcb = lambda: None
-                keyboard.add_hotkey(norm, tcb, suppress=False)
-                keyboard.remove_hotkey(norm)
-            except Exception as e:
-                return False, f"Keybind may be in use or unavailable: {str(e)}"
+            if n in RESERVED_KEYBINDS:
+                return False, f"Keybind '{n}' is reserved by the system"
+
+            owner = self._keybind_index.get(n)
+            if owner is not None and owner != action:
+                if owner.startswith(PRESET_ACTION_PREFIX):
+                    return False, f"Keybind is already used by region preset '{owner[len(PRESET_ACTION_PREFIX):]}'"
+                return False, f"Keybind is already assigned to '{owner.replace('_', ' ').title()}'"
 
         return True, None
@@ -0,0 +1,104 @@
+import json
+import os
+import socket
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+COMMANDS = (
+    "capture_region",
+    "capture_fullscreen",
+    "capture_monitor",
+    "capture_preset",
+    "capture_last_region",
+    "status",
+    "stats",
+    "memory",
+    "stalls",
+)
+
+MAX_MESSAGE_SIZE = 64 * 1024
+
+
+class IPCError(Exception):
+    pass
+
+
+def is_supported() -> bool:
+    return hasattr(socket, "AF_UNIX")
+
+
+def default_socket_path() -> str:
+    rt = os.environ.get("XDG_RUNTIME_DIR")
+    if rt:
+        return str(Path(rt) / "swip.sock")
+    return str(Path.home() / ".screenshot_overlay_tool" / "swip.sock")
+
+
+def encode_message(msg: Dict[str, Any]) -> bytes:
+    return json.dumps(msg, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def decode_message(line: bytes) -> Dict[str, Any]:
+    if len(line) > MAX_MESSAGE_SIZE:
+        raise IPCError("Message too large")
+    try:
+        msg = json.loads(line.decode("utf-8"))
+    except (UnicodeDecodeError, ValueError) as e:
+        raise IPCError(f"Malformed message: {e}")
+    if not isinstance(msg, dict):
+        raise IPCError("Message must be a JSON object")
+    return msg
+
+
+def _connect(socket_path: str, timeout: Optional[float]) -> socket.socket:
+    if not is_supported():
+        raise IPCError("Unix domain sockets are not supported on this platform")
+
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    s.settimeout(timeout)
+    try:
+        s.connect(socket_path)
+    except OSError as e:
+        s.close()
+        raise IPCError(f"Could not connect to {socket_path}: {e}")
+    return s
+
+
+def send_request(cmd: str, args: Optional[Dict[str, Any]] = None,
+                 socket_path: Optional[str] = None,
+                 timeout: Optional[float] = 30.0) -> Dict[str, Any]:
+    if socket_path is None:
+        socket_path = default_socket_path()
+
+    s = _connect(socket_path, timeout)
+    try:
+        s.sendall(encode_message({"cmd": cmd, "args": args or {}}))
+        f = s.makefile("rb")
+        try:
+            line = f.readline(MAX_MESSAGE_SIZE + 1)
+        finally:
+            f.close()
+    except OSError as e:
+        raise IPCError(f"Request '{cmd}' failed: {e}")
+    finally:
+        s.close()
+
+    if not line:
+        raise IPCError("Connection closed without a response")
+
+    return decode_message(line)
+
+
+def is_instance_running(socket_path: Optional[str] = None) -> bool:
+    if socket_path is None:
+        socket_path = default_socket_path()
+
+    if not is_supported() or not os.path.exists(socket_path):
+        return False
+
+    try:
+        _connect(socket_path, 0.5).close()
+    except IPCError:
+        return False
+    return True
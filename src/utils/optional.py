@@ -0,0 +1,14 @@
+import importlib
+from functools import lru_cache
+from types import ModuleType
+from typing import Optional
+
+
+@lru_cache(maxsize=None)
+def optional_import(name: str) -> Optional[ModuleType]:
+    # Deferred so optional heavy modules (numpy) only cost memory once a
+    # code path actually needs them.
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.services.atomicwrite import AtomicWriter, is_temp_name, parse_temp_name, temp_path_for
+from src.services.filemanager import FileManager
+
+
+def _dead_pid() -> int:
+    p = subprocess.Popen([sys.executable, "-c", "pass"])
+    p.wait()
+    return p.pid
+
+
+@pytest.mark.parametrize("policy", ["none", "file", "batch"])
+def test_replaces_target(tmp_path, policy):
+    target = tmp_path / "shot.png"
+    target.write_bytes(b"old")
+    w = AtomicWriter(policy, batch_interval=0.01)
+    with w.open(target) as f:
+        f.write(b"new")
+    w.close()
+
+    assert target.read_bytes() == b"new"
+    assert os.listdir(tmp_path) == ["shot.png"]
+    st = w.stats()
+    assert st["write"]["count"] == 1 and st["pending_fsync"] == 0
+
+
+def test_failed_write_keeps_original(tmp_path):
+    target = tmp_path / "shot.png"
+    target.write_bytes(b"old")
+    w = AtomicWriter("file")
+    with pytest.raises(RuntimeError):
+        with w.open(target) as f:
+            f.write(b"partial")
+            raise RuntimeError("encoder failed")
+
+    assert target.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["shot.png"]
+    assert w.stats()["failed"] == 1
+
+
+def test_temp_names_round_trip(tmp_path):
+    tmp = temp_path_for(tmp_path / "screenshot_1.png")
+    assert parse_temp_name(tmp.name) == ("screenshot_1.png", os.getpid())
+    assert not is_temp_name("screenshot_1.png")
+    assert not is_temp_name(".hidden.tmp")
+
+
+def test_cleanup_skips_live_writers(tmp_path):
+    dead = tmp_path / f".screenshot_1.png.{_dead_pid()}.tmp"
+    live = tmp_path / f".screenshot_2.png.{os.getppid()}.tmp"
+    own = temp_path_for(tmp_path / "screenshot_3.png")
+    other = tmp_path / f".notes.txt.{_dead_pid()}.tmp"
+    for p in (dead, live, own, other):
+        p.write_bytes(b"x")
+
+    assert FileManager(str(tmp_path)).cleanup_temp_files() == 1
+    assert not dead.exists()
+    assert live.exists() and own.exists() and other.exists()
@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from src.services.capturequeue import CaptureQueue
+
+
+def _image() -> Image.Image:
+    return Image.new('RGB', (10, 10))  # 300 bytes
+
+
+class _Gate:
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Semaphore(0)
+        self.done = []
+
+    def process(self, job):
+        self.started.release()
+        self.release.wait(5)
+        self.done.append(job.tag)
+        return f"{job.tag}.png"
+
+
+@pytest.fixture
+def gate():
+    g = _Gate()
+    yield g
+    g.release.set()
+
+
+def _queue(gate, policy, **kw):
+    q = CaptureQueue(gate.process, policy=policy, workers=1, **kw)
+    q.start()
+    return q
+
+
+def _busy(q, gate):
+    # One job being saved by the only worker.
+    job = q.submit(_image(), tag="active")
+    assert gate.started.acquire(timeout=5)
+    return job
+
+
+def test_active_job_counts_against_max_bytes(gate):
+    q = _queue(gate, "drop_newest", max_jobs=8, max_bytes=500)
+    _busy(q, gate)
+    job = q.submit(_image(), tag="second")
+    assert job.status == "dropped"
+    gate.release.set()
+    q.stop()
+    assert gate.done == ["active"]
+
+
+def test_oversized_job_accepted_when_idle(gate):
+    q = _queue(gate, "drop_newest", max_bytes=100)
+    gate.release.set()
+    assert q.submit(_image(), tag="big").wait(5) == "big.png"
+    q.stop()
+
+
+def test_drop_oldest_keeps_newest(gate):
+    q = _queue(gate, "drop_oldest", max_jobs=2)
+    _busy(q, gate)
+    jobs = [q.submit(_image(), tag=i) for i in range(4)]
+    assert [j.status for j in jobs[:2]] == ["dropped", "dropped"]
+    gate.release.set()
+    q.stop()
+    assert gate.done == ["active", 2, 3]
+    assert q.stats()["dropped_oldest"] == 2
+
+
+def test_coalesce_keeps_only_latest(gate):
+    q = _queue(gate, "coalesce", max_jobs=1)
+    _busy(q, gate)
+    for i in range(3):
+        q.submit(_image(), tag=i)
+    gate.release.set()
+    q.stop()
+    assert gate.done == ["active", 2]
+    assert q.stats()["coalesced"] == 2
+
+
+def test_block_waits_for_room(gate):
+    q = _queue(gate, "block", max_jobs=1)
+    _busy(q, gate)
+    q.submit(_image(), tag=0)
+    threading.Timer(0.1, gate.release.set).start()
+    t0 = time.monotonic()
+    job = q.submit(_image(), tag=1)
+    assert time.monotonic() - t0 >= 0.05
+    assert job.wait(5) == "1.png"
+    q.stop()
+
+
+def test_block_timeout_zero_never_waits(gate):
+    q = _queue(gate, "block", max_jobs=1, block_timeout=None)
+    _busy(q, gate)
+    q.submit(_image(), tag=0)
+    t0 = time.monotonic()
+    job = q.submit(_image(), tag=1, block_timeout=0)
+    assert time.monotonic() - t0 < 0.5
+    assert job.status == "dropped"
+    gate.release.set()
+    q.stop()
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+from PIL import Image, ImageDraw
+
+from src.services import colorreduce
+from src.services.colorreduce import reduce_colors
+
+
+def _ui_capture(colors: int = 40, size=(300, 200)) -> Image.Image:
+    im = Image.new('RGB', size, (240, 240, 240))
+    d = ImageDraw.Draw(im)
+    for i in range(colors - 1):
+        d.rectangle((i * 7 % size[0], i * 5 % size[1], i * 7 % size[0] + 20, i * 5 % size[1] + 12),
+                    fill=(i * 6 % 256, 255 - i * 3, i * 11 % 256))
+    return im
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "no-numpy"])
+def numpy_or_not(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(colorreduce, "optional_import", lambda name: None)
+
+
+def test_palette_reduction_is_exact(numpy_or_not):
+    src = _ui_capture()
+    out = reduce_colors(src)
+    assert out.mode == 'P'
+    assert out.convert('RGB').tobytes() == src.tobytes()
+
+
+def test_opaque_rgba_is_reduced(numpy_or_not):
+    src = _ui_capture().convert('RGBA')
+    out = reduce_colors(src)
+    assert out.mode == 'P'
+    assert out.convert('RGBA').tobytes() == src.tobytes()
+
+
+def test_grayscale_becomes_l(numpy_or_not):
+    src = Image.linear_gradient('L').resize((256, 64)).convert('RGB')
+    out = reduce_colors(src)
+    assert out.mode == 'L'
+    assert out.convert('RGB').tobytes() == src.tobytes()
+
+
+def test_photo_and_translucent_images_are_left_alone():
+    rnd = random.Random(1)
+    photo = Image.frombytes('RGB', (200, 200), bytes(rnd.getrandbits(8) for _ in range(200 * 200 * 3)))
+    assert reduce_colors(photo) is photo
+
+    translucent = _ui_capture().convert('RGBA')
+    translucent.putpixel((0, 0), (0, 0, 0, 128))
+    assert reduce_colors(translucent) is translucent
@@ -0,0 +1,27 @@
+import pytest
+
+from src.utils.config import ConfigManager, normalize_keybind
+
+
+@pytest.mark.parametrize("a, b", [
+    ("ctrl+shift", "shift+ctrl"),
+    ("Shift + Ctrl + S", "ctrl+shift+s"),
+    ("cmd+alt", "alt+super"),
+    ("ctrl+return", "ctrl+enter"),
+])
+def test_equivalent_keybinds_normalize_alike(a, b):
+    assert normalize_keybind(a) is not None
+    assert normalize_keybind(a) == normalize_keybind(b)
+
+
+@pytest.mark.parametrize("kb", ["s", "ctrl+", "ctrl+ctrl", "ctrl+cmd+super", "hyper+s", "ctrl+%"])
+def test_invalid_keybinds(kb):
+    assert normalize_keybind(kb) is None
+
+
+def test_conflicts_and_reserved(tmp_path):
+    c = ConfigManager(str(tmp_path / "config.json"))
+    assert c.validate_keybind("alt+f4", check_conflicts=True, action="overlay_toggle")[0] is False
+    assert c.validate_keybind("shift+ctrl+f", check_conflicts=True, action="overlay_toggle")[0] is False
+    assert c.validate_keybind("shift+ctrl+s", check_conflicts=True, action="overlay_toggle") == (True, None)
+    assert c.validate_keybind("alt+f4") == (True, None)
@@ -0,0 +1,135 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.services.exporter import ExportQueue
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with self.server.lock:
+            self.server.posts += 1
+            delay = self.server.delay
+        time.sleep(delay)
+        with self.server.lock:
+            status = self.server.statuses.pop(0) if self.server.statuses else 200
+            if status == 200:
+                self.server.received.append((self.headers["X-Filename"], body))
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    srv.daemon_threads = True
+    srv.lock = threading.Lock()
+    srv.connections = 0
+    srv.posts = 0
+    srv.delay = 0.0
+    srv.statuses = []
+    srv.received = []
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _queue(tmp_path, server, **kw):
+    url = f"http://127.0.0.1:{server.server_address[1]}/upload"
+    return ExportQueue(str(tmp_path / "queue.sqlite3"), [{"type": "http", "url": url}],
+                       concurrency=1, backoff_base=0.05, backoff_max=0.1, **kw)
+
+
+def _capture(tmp_path, name: str) -> str:
+    p = tmp_path / name
+    p.write_bytes(b"\x89PNG fake " + name.encode())
+    return str(p)
+
+
+def _wait_for(pred, timeout: float = 5.0) -> bool:
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if pred():
+            return True
+        time.sleep(0.01)
+    return pred()
+
+
+def test_retries_after_503_then_succeeds(tmp_path, server):
+    server.statuses = [503]
+    q = _queue(tmp_path, server)
+    q.start()
+    try:
+        q.enqueue(_capture(tmp_path, "picture-1.png"))
+        assert _wait_for(lambda: q.stats()["delivered"] == 1)
+        st = q.stats()
+    finally:
+        q.stop()
+
+    assert st["failed_attempts"] == 1
+    assert st["pending"] == 0 and st["dead"] == 0
+    assert server.received == [("picture-1.png", b"\x89PNG fake picture-1.png")]
+
+
+def test_reuses_connection(tmp_path, server):
+    q = _queue(tmp_path, server)
+    q.start()
+    try:
+        for i in range(1, 4):
+            q.enqueue(_capture(tmp_path, f"picture-{i}.png"))
+            assert _wait_for(lambda: q.stats()["delivered"] == i)
+    finally:
+        q.stop()
+
+    assert len(server.received) == 3
+    assert server.connections == 1
+
+
+def test_pending_deliveries_survive_restart(tmp_path, server):
+    q = _queue(tmp_path, server)
+    q.enqueue(_capture(tmp_path, "picture-1.png"))
+    q.stop()
+
+    q = _queue(tmp_path, server)
+    q.start()
+    try:
+        assert _wait_for(lambda: q.stats()["delivered"] == 1)
+    finally:
+        q.stop()
+    assert [n for n, _ in server.received] == ["picture-1.png"]
+
+
+def test_timeout_is_not_resent_immediately(tmp_path, server):
+    server.delay = 0.5
+    q = _queue(tmp_path, server, max_attempts=1, timeout=0.2)
+    q.start()
+    try:
+        q.enqueue(_capture(tmp_path, "picture-1.png"))
+        assert _wait_for(lambda: q.stats()["dead"] == 1)
+    finally:
+        q.stop()
+    assert server.posts == 1
+
+
+def test_enqueue_after_stop_is_ignored(tmp_path, server):
+    q = _queue(tmp_path, server)
+    q.start()
+    q.stop()
+    q.enqueue(_capture(tmp_path, "picture-1.png"))
+    assert server.posts == 0
@@ -0,0 +1,59 @@
+import io
+import struct
+
+import pytest
+from PIL import Image
+
+from src.services import pngstream
+from src.services.pngstream import PngWriter, write_png
+
+
+def _sample(mode: str, size=(67, 301)) -> Image.Image:
+    im = Image.effect_noise(size, 80).convert('RGB')
+    if mode == 'P':
+        return im.quantize(40)
+    return im.convert(mode)
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "no-numpy"])
+def numpy_or_not(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(pngstream, "optional_import", lambda name: None)
+
+
+@pytest.mark.parametrize("mode", ["L", "LA", "RGB", "RGBA", "P"])
+def test_write_png_round_trip(mode, numpy_or_not):
+    src = _sample(mode)
+    buf = io.BytesIO()
+    write_png(src, buf, band_rows=50)
+
+    buf.seek(0)
+    with Image.open(buf) as out:
+        out.load()
+        assert out.mode == mode
+        assert out.size == src.size
+        if mode == 'P':
+            assert out.convert('RGB').tobytes() == src.convert('RGB').tobytes()
+        else:
+            assert out.tobytes() == src.tobytes()
+
+
+def test_unknown_height_patches_ihdr():
+    src = _sample('RGB')
+    buf = io.BytesIO()
+    pw = PngWriter(buf, src.width, 'RGB')
+    for y in range(0, src.height, 64):
+        pw.write_rows(src.crop((0, y, src.width, min(y + 64, src.height))))
+    pw.close()
+
+    data = buf.getvalue()
+    assert struct.unpack('>II', data[16:24]) == src.size
+    with Image.open(io.BytesIO(data)) as out:
+        assert out.tobytes() == src.tobytes()
+
+
+def test_known_height_must_match():
+    pw = PngWriter(io.BytesIO(), 8, 'L', height=4)
+    pw.write_rows(Image.new('L', (8, 3)))
+    with pytest.raises(ValueError):
+        pw.close()
@@ -0,0 +1,68 @@
+import os
+import random
+
+from PIL import Image, ImageDraw
+
+from src.services.recompress import ArchiveRecompressor, recompress_file
+
+
+def _ui_capture(path, mode='RGB'):
+    im = Image.new('RGB', (400, 300), (250, 250, 250))
+    d = ImageDraw.Draw(im)
+    for i in range(30):
+        d.rectangle((i * 13, i * 9, i * 13 + 40, i * 9 + 20), fill=(i * 8, 100, 255 - i * 8))
+    im = im.convert(mode)
+    im.save(path, compress_level=0, dpi=(144, 144))
+    return im
+
+
+def test_recompress_keeps_pixels_and_metadata(tmp_path):
+    for mode in ('RGB', 'RGBA', 'L'):
+        p = tmp_path / f"shot-{mode}.png"
+        src = _ui_capture(p, mode)
+        mtime = os.stat(p).st_mtime_ns
+
+        size = os.path.getsize(p)
+        old, new = recompress_file(str(p))
+        assert (old, os.path.getsize(p)) == (size, new)
+        assert new < old
+        assert os.stat(p).st_mtime_ns == mtime
+        with Image.open(p) as out:
+            assert round(out.info["dpi"][0]) == 144
+            assert out.convert(mode).tobytes() == src.tobytes()
+    assert not [f for f in os.listdir(tmp_path) if f.startswith('.')]
+
+
+def test_already_small_file_is_left_alone(tmp_path):
+    p = tmp_path / "shot.png"
+    rnd = random.Random(3)
+    noise = Image.frombytes('RGB', (64, 64), bytes(rnd.getrandbits(8) for _ in range(64 * 64 * 3)))
+    noise.save(p, optimize=True, compress_level=9)
+    before = p.read_bytes()
+    old, new = recompress_file(str(p))
+    assert old == new == len(before)
+    assert p.read_bytes() == before
+
+
+def test_pending_and_prune(tmp_path):
+    for n in ("a.png", "b.png", "c.png"):
+        _ui_capture(tmp_path / n)
+    (tmp_path / f".d.png.{os.getpid()}.tmp").write_bytes(b"x")
+    (tmp_path / "notes.txt").write_bytes(b"x")
+
+    r = ArchiveRecompressor(str(tmp_path), str(tmp_path / "ck.json"), min_age=0)
+    assert list(r._pending()) == ["a.png", "b.png", "c.png"]
+
+    for n in ("a.png", "b.png", "c.png"):
+        st = os.stat(tmp_path / n)
+        r._done[n] = (st.st_size, st.st_mtime_ns)
+    assert list(r._pending()) == []
+
+    os.unlink(tmp_path / "b.png")
+    r._prune()
+    assert sorted(r._done) == ["a.png", "c.png"]
+    r._save_checkpoint()
+
+    r2 = ArchiveRecompressor(str(tmp_path), str(tmp_path / "ck.json"), min_age=0)
+    r2._load_checkpoint()
+    assert r2._done == r._done
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+import pytest
+
+# CronSpec lives next to the Qt-driven scheduler.
+pytest.importorskip("PyQt6")
+from src.services.scheduler import CronSpec  # noqa: E402
+
+
+def test_cron_day_fields_are_ored():
+    # The 1st of the month or any Monday.
+    c = CronSpec("0 12 1 * 1")
+    assert c.next_after(datetime(2026, 1, 1, 0, 0)) == datetime(2026, 1, 1, 12, 0)
+    assert c.next_after(datetime(2026, 1, 1, 12, 0)) == datetime(2026, 1, 5, 12, 0)
+
+
+def test_cron_star_day_defers_to_the_other():
+    # Fridays only, since day-of-month is '*'.
+    c = CronSpec("30 9 * * 5")
+    assert c.next_after(datetime(2026, 1, 1, 0, 0)) == datetime(2026, 1, 2, 9, 30)
+    assert c.next_after(datetime(2026, 1, 2, 9, 30)) == datetime(2026, 1, 9, 9, 30)
+
+
+def test_cron_leap_day():
+    assert CronSpec("0 0 29 2 *").next_after(datetime(2026, 3, 1)) == datetime(2028, 2, 29)
+
+
+def test_cron_rejects_bad_specs():
+    with pytest.raises(ValueError):
+        CronSpec("* * *")
+    with pytest.raises(ValueError):
+        CronSpec("0 0 31 2 *").next_after(datetime(2026, 1, 1))
@@ -0,0 +1,80 @@
+import io
+import random
+
+from PIL import Image, ImageDraw
+
+from src.services.scrollcapture import ScrollCapture, find_offset, row_hashes
+
+
+HEADER = 20
+FOOTER = 15
+VIEW = 120
+
+
+def _page(height: int = 600, width: int = 80) -> Image.Image:
+    # Distinct rows, like lines of text, so every scroll offset is unique.
+    rnd = random.Random(7)
+    im = Image.new('RGB', (width, height), 'white')
+    d = ImageDraw.Draw(im)
+    for y in range(height):
+        x = rnd.randrange(width - 10)
+        d.line((x, y, x + rnd.randrange(3, 10), y), fill=(rnd.randrange(256), 0, y % 256))
+    return im
+
+
+def _frame(page: Image.Image, scroll: int) -> Image.Image:
+    # A window with a fixed header and footer around the scrolled content.
+    w = page.width
+    f = Image.new('RGB', (w, VIEW), 'gray')
+    f.paste(page.crop((0, scroll, w, scroll + VIEW - HEADER - FOOTER)), (0, HEADER))
+    ImageDraw.Draw(f).rectangle((0, VIEW - FOOTER, w, VIEW), fill=(10, 200, 30))
+    return f
+
+
+def test_find_offset_ignores_fixed_header_and_footer():
+    page = _page()
+    a = row_hashes(_frame(page, 0))
+    b = row_hashes(_frame(page, 37))
+    assert find_offset(a, b, HEADER, FOOTER) == 37
+    assert find_offset(a, a, HEADER, FOOTER) == 0
+    # The header and footer alone would pin the match to zero.
+    assert find_offset(a, b) is None
+
+
+def test_find_offset_rejects_scrolls_past_the_frame():
+    page = _page()
+    a = row_hashes(_frame(page, 0))
+    b = row_hashes(_frame(page, VIEW))
+    assert find_offset(a, b, HEADER, FOOTER) is None
+
+
+def test_stitched_output_matches_page():
+    page = _page()
+    buf = io.BytesIO()
+    sc = ScrollCapture(buf, ignore_top=HEADER, ignore_bottom=FOOTER)
+    for s in (0, 30, 30, 71, 130, 185, 240):
+        sc.add_frame(_frame(page, s))
+    height = sc.finish()
+
+    content = VIEW - HEADER - FOOTER
+    assert height == VIEW + 240
+    assert sc.stats()["unchanged"] == 0 and sc.mismatches == 0
+
+    buf.seek(0)
+    with Image.open(buf) as out:
+        out.load()
+        expected = Image.new('RGB', (page.width, height))
+        first = _frame(page, 0)
+        expected.paste(first.crop((0, 0, page.width, VIEW - FOOTER)), (0, 0))
+        expected.paste(page.crop((0, content, page.width, 240 + content)), (0, VIEW - FOOTER))
+        expected.paste(first.crop((0, VIEW - FOOTER, page.width, VIEW)), (0, height - FOOTER))
+        assert out.tobytes() == expected.tobytes()
+
+
+def test_max_height_caps_output():
+    page = _page()
+    sc = ScrollCapture(io.BytesIO(), ignore_top=HEADER, ignore_bottom=FOOTER, max_height=200)
+    for s in range(0, 400, 40):
+        sc.add_frame(_frame(page, s))
+    assert sc.at_limit()
+    assert sc.finish() == 200
@@ -0,0 +1,39 @@
+import pytest
+
+from src.services.timerwheel import TimerWheel
+
+
+@pytest.mark.parametrize("base", [0.0, 1e5, 1.2345678e7])
+def test_next_expiry_maps_back_to_its_tick(base):
+    w = TimerWheel(base, 0.05)
+    t0 = w._cur
+    for t in range(t0 + 1, t0 + 2001):
+        assert w._tick_of(t * 0.05) == t
+
+
+def test_wheel_fires_each_timer_once_at_its_deadline():
+    base = 1.2345678e7
+    w = TimerWheel(base, 0.05, slots=64)
+    deadlines = {i: base + 0.013 * i * i for i in range(1, 60)}
+    for i, d in deadlines.items():
+        w.add(d, i)
+
+    fired = {}
+    now = base
+    while len(w):
+        now = w.next_expiry()
+        for i in w.advance(now):
+            fired[i] = now
+    assert set(fired) == set(deadlines)
+    for i, at in fired.items():
+        assert deadlines[i] <= at < deadlines[i] + 0.05 + 1e-6
+
+
+def test_cancelled_timer_does_not_fire():
+    w = TimerWheel(0.0, 0.05)
+    h = w.add(1.0, "a")
+    w.add(2.0, "b")
+    w.cancel(h)
+    assert len(w) == 1
+    assert w.next_expiry() == pytest.approx(2.0)
+    assert w.advance(5.0) == ["b"]
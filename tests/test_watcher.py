@@ -0,0 +1,42 @@
+import time
+
+from PIL import Image
+
+from src.services.watcher import RegionWatcher
+
+
+def _watcher(frames, captured):
+    return RegionWatcher(lambda x, y, w, h: frames[0], lambda w, img: captured.append(img))
+
+
+def test_change_during_cooldown_is_captured_afterwards():
+    frames = [Image.new('RGB', (64, 64), 'white')]
+    captured = []
+    rw = _watcher(frames, captured)
+    w = rw.add_watch("w", (0, 0, 64, 64), cooldown=0.2)
+
+    assert not rw.poll(w)
+    frames[0] = Image.new('RGB', (64, 64), 'black')
+    assert rw.poll(w)
+    assert len(captured) == 1
+
+    frames[0] = Image.new('RGB', (64, 64), 'red')
+    rw.poll(w)
+    assert len(captured) == 1
+
+    time.sleep(0.25)
+    assert rw.poll(w)
+    assert len(captured) == 2
+    assert captured[-1].getpixel((0, 0)) == (255, 0, 0)
+
+    assert not rw.poll(w)
+    assert len(captured) == 2
+
+
+def test_unchanged_region_backs_off():
+    frames = [Image.new('RGB', (64, 64), 'white')]
+    rw = _watcher(frames, [])
+    w = rw.add_watch("w", (0, 0, 64, 64), min_interval=1.0, max_interval=4.0, backoff=2.0)
+    for _ in range(4):
+        assert not rw.poll(w)
+    assert w.interval == 4.0